@@ -0,0 +1,50 @@
+from monster import MonsterSearch, MonsterTextParser, KeywordAggregator
+from helpers import DATA_SCI_KEYWORDS
+from tempfile import TemporaryDirectory
+import json
+import os
+
+# Checks that KeywordAggregator keeps the same statistics as recounting with count_words
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+delete_matching = "[^a-zA-Z.+3]"  # the "." and "3" are for D3.js
+parser = MonsterTextParser(DATA_SCI_KEYWORDS)
+listings = list(search)
+
+aggregator = KeywordAggregator(DATA_SCI_KEYWORDS, delete_matching=delete_matching)
+for listing in listings[:100]:
+    aggregator.add(listing)
+assert aggregator.count_words().equals(parser.count_words(listings[:100], delete_matching=delete_matching))
+
+# remove some, add the rest, and re-add a few (which mustn't count twice)
+for listing in listings[:40]:
+    aggregator.remove(listing.job_id)
+for listing in listings[90:]:
+    aggregator.add(listing)
+assert len(aggregator) == len(listings) - 40
+assert aggregator.count_words(as_percentage=True).equals(
+    parser.count_words(listings[40:], as_percentage=True, delete_matching=delete_matching))
+
+# follow a search as listings expire
+# (listing 17 came back without a description, so it's left out until it has one)
+search.expired = dict((job_id, '2019-06-02T00:00:00+00:00') for job_id in search.job_ids[:10])
+assert listings[17].description == '' and aggregator.update(search) == (29, 0)
+search.expired.update((job_id, '2019-06-03T00:00:00+00:00') for job_id in search.job_ids[10:20])
+assert aggregator.update(search) == (0, 9)
+assert aggregator.count_words().equals(parser.count_words(listings[20:], delete_matching=delete_matching))
+
+search.expired.clear()
+assert aggregator.update(search) == (19, 0)
+listings[17].description = 'Python, SQL and Spark'
+assert aggregator.update(search) == (1, 0)
+assert aggregator.count_words(as_percentage=True).equals(
+    parser.count_words(listings, as_percentage=True, delete_matching=delete_matching))
+
+# snapshots load back to the same statistics
+with TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'keywords.json')
+    aggregator.save(path)
+    assert KeywordAggregator.load(path).count_words().equals(aggregator.count_words())
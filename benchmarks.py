@@ -0,0 +1,213 @@
+from monster import MonsterSearch, MonsterTextParser, MonsterFetcher, make_soup, SEARCH_RESULTS_STRAINER
+from helpers import DATA_SCI_KEYWORDS
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from bs4 import FeatureNotFound
+from tempfile import TemporaryDirectory
+from threading import Thread
+from datetime import datetime, timezone
+from time import perf_counter, sleep
+import argparse
+import platform
+import json
+import sys
+import os
+
+"""
+Offline benchmarks for the scraping and analysis hot paths. Monster is stood in for by a local HTTP server serving
+the saved pages in data/fixtures, and large searches are generated from data/data_scientist_nyc_search.json.
+
+Usage: python benchmarks.py [--output results.json] [--max-listings 100000] [--latency 0.02]
+
+Results are printed as they come in and written as JSON, one record per measurement, for regression tracking.
+"""
+
+FIXTURES_DIR = './data/fixtures'
+SEARCH_FILE = './data/data_scientist_nyc_search.json'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves the saved search results page for /jobs/search/ and the saved job page for anything else, after
+    waiting `latency` seconds to mimic a real server.
+    """
+    protocol_version = 'HTTP/1.1'
+    search_page = b''
+    job_page = b''
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency > 0:
+            sleep(self.latency)
+        body = self.search_page if self.path.startswith('/jobs/search/') else self.job_page
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def synthetic_search(search: MonsterSearch, num_listings: int) -> MonsterSearch:
+    """
+    :return: a search with num_listings listings, made by repeating the listings in search under new job ids
+    """
+    originals = list(search)
+    results = dict()
+    job_ids = list()
+    for i in range(num_listings):
+        record = originals[i % len(originals)].json_dict()
+        record['job_id'] = str(10 ** 9 + i)
+        results[record['job_id']] = record
+        job_ids.append(record['job_id'])
+    in_dict = search.json_dict()
+    in_dict['results'] = results
+    in_dict['job_ids'] = job_ids
+    return MonsterSearch.json_deserialize(in_dict=in_dict, fetcher=search.fetcher)
+
+
+class BenchmarkSuite:
+
+    def __init__(self, max_listings: int = 100000, latency: float = 0.02, repeat: int = 3):
+        """
+        :param max_listings: largest synthetic search to count keywords in
+        :param latency: seconds the local server waits before answering each request
+        :param repeat: each timing is the best of this many runs
+        """
+        self.max_listings = max_listings
+        self.latency = latency
+        self.repeat = repeat
+        self.results = list()
+
+        with open(SEARCH_FILE, 'r') as f:
+            self.search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+        with open(os.path.join(FIXTURES_DIR, 'search_results.html'), 'rb') as f:
+            self.search_page = f.read()
+        with open(os.path.join(FIXTURES_DIR, 'job_description.html'), 'rb') as f:
+            self.job_page = f.read()
+
+    def best_time(self, func, repeat: int = None) -> float:
+        times = list()
+        for _ in range(self.repeat if repeat is None else repeat):
+            start = perf_counter()
+            func()
+            times.append(perf_counter() - start)
+        return min(times)
+
+    def record(self, name: str, value: float, unit: str, **params):
+        self.results.append({'name': name, 'params': params, 'value': value, 'unit': unit})
+        params_string = ', '.join(f'{k}={v}' for k, v in params.items())
+        print(f'{name:<28}{params_string:<40}{value:>14,.2f} {unit}')
+
+    def run(self) -> dict:
+        FixtureHandler.search_page = self.search_page
+        FixtureHandler.job_page = self.job_page
+        FixtureHandler.latency = self.latency
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        server.daemon_threads = True
+        Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            self.bench_listing_parse()
+            self.bench_search_fetch(base_url)
+            self.bench_description_fetch(base_url)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.bench_serialization()
+        self.bench_count_words()
+        return {'timestamp': datetime.now(timezone.utc).isoformat(), 'python': sys.version.split()[0],
+                'platform': platform.platform(), 'results': self.results}
+
+    def bench_listing_parse(self):
+        html = self.search_page.decode('utf-8')
+        for parser in ('html.parser', 'lxml'):
+            search = MonsterSearch(self.search.location, self.search.query, extra_titles=self.search.extra_titles,
+                                   parser=parser)
+            try:
+                make_soup(html, parser, parse_only=SEARCH_RESULTS_STRAINER)
+            except FeatureNotFound:
+                continue
+
+            def parse():
+                search.results = dict()
+                search.job_ids = list()
+                search.seen_job_ids = set()
+                search.add_listings(html)
+
+            seconds = self.best_time(parse)
+            self.record('listing_parse', len(search.seen_job_ids) / seconds, 'listings/s', parser=parser)
+
+    def bench_search_fetch(self, base_url: str):
+        fetcher = MonsterFetcher()
+        search = MonsterSearch(self.search.location, self.search.query, extra_titles=self.search.extra_titles,
+                               fetcher=fetcher)
+        search.base_url = f'{base_url}/jobs/search/?q=data-scientist'
+
+        def fetch():
+            search.fetch_listings(refetch=True)
+
+        seconds = self.best_time(fetch)
+        self.record('search_fetch', len(search) / seconds, 'listings/s', latency=self.latency)
+        fetcher.close()
+
+    def bench_description_fetch(self, base_url: str):
+        num_listings = 64
+        search = synthetic_search(self.search, num_listings)
+        for workers in (1, 4, 16):
+            fetcher = MonsterFetcher(pool_size=workers)
+
+            def fetch():
+                for listing in search:
+                    listing.fetcher = fetcher
+                    listing.job_url = f'{base_url}/job/{listing.job_id}'
+                    listing.description = ''
+                search.fetch_descriptions(suppress_output=True, max_workers=workers, rate_limit=0)
+
+            seconds = self.best_time(fetch)
+            self.record('description_fetch', num_listings / seconds, 'descriptions/s', workers=workers,
+                        latency=self.latency)
+            fetcher.close()
+
+    def bench_serialization(self):
+        search = self.search
+        serialized = search.json_serialize()
+        self.record('json_serialize', self.best_time(search.json_serialize) * 1000, 'ms', listings=len(search))
+        self.record('json_deserialize',
+                    self.best_time(lambda: MonsterSearch.json_deserialize(in_str=serialized)) * 1000, 'ms',
+                    listings=len(search))
+
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'search.jsonl')
+            self.record('jsonl_write', self.best_time(lambda: search.to_jsonl(path)) * 1000, 'ms',
+                        listings=len(search))
+            self.record('jsonl_read', self.best_time(lambda: MonsterSearch.from_jsonl(path)) * 1000, 'ms',
+                        listings=len(search))
+
+    def bench_count_words(self):
+        parser = MonsterTextParser(DATA_SCI_KEYWORDS)
+        delete_matching = "[^a-zA-Z.+3]"  # the "." and "3" are for D3.js
+        sizes = [len(self.search)] + [x for x in (1000, 10000, 100000) if x <= self.max_listings]
+        for size in sizes:
+            search = self.search if size == len(self.search) else synthetic_search(self.search, size)
+            # the largest sizes take long enough that one run is plenty
+            seconds = self.best_time(lambda: parser.count_words(search, delete_matching=delete_matching),
+                                     repeat=self.repeat if size <= 10000 else 1)
+            self.record('count_words', seconds, 's', listings=size)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Offline benchmarks for monster.py')
+    arg_parser.add_argument('--output', help='write results as JSON to this file')
+    arg_parser.add_argument('--max-listings', type=int, default=100000,
+                            help='largest synthetic search to count keywords in')
+    arg_parser.add_argument('--latency', type=float, default=0.02,
+                            help='seconds the local server waits before each response')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='each timing is the best of this many runs')
+    args = arg_parser.parse_args()
+
+    report = BenchmarkSuite(max_listings=args.max_listings, latency=args.latency, repeat=args.repeat).run()
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
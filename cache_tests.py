@@ -0,0 +1,87 @@
+from monster import MonsterFetcher, ResponseCache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.exceptions import ConnectionError
+from threading import Thread
+from tempfile import TemporaryDirectory
+import os
+
+# Checks that ResponseCache serves fresh pages from disk, revalidates stale ones and works offline
+
+hits = dict()
+not_modified = dict()
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        hits[self.path] = hits.get(self.path, 0) + 1
+        etag = f'"{self.path}-v1"'
+        if self.headers.get('If-None-Match') == etag:
+            not_modified[self.path] = not_modified.get(self.path, 0) + 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = f'<html><body><div id="JobDescription">{self.path} {"x" * 1000}</div></body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), ETagHandler)
+Thread(target=server.serve_forever, daemon=True).start()
+base_url = f'http://127.0.0.1:{server.server_port}'
+
+with TemporaryDirectory() as tmp_dir:
+    cache_path = os.path.join(tmp_dir, 'responses.sqlite')
+
+    # fresh entries never reach the server
+    fetcher = MonsterFetcher(cache=ResponseCache(cache_path))
+    first = fetcher.get(f'{base_url}/1')
+    second = fetcher.get(f'{base_url}/1')
+    assert first.text == second.text and hits['/1'] == 1
+    assert fetcher.stats()['cache_hits'] == 1
+    fetcher.cache.close()
+
+    # stale entries are revalidated and the server answers 304
+    fetcher = MonsterFetcher(cache=ResponseCache(cache_path, ttl=0))
+    third = fetcher.get(f'{base_url}/1')
+    assert third.text == first.text and hits['/1'] == 2 and not_modified['/1'] == 1
+    assert fetcher.stats()['revalidations'] == 1
+    fetcher.cache.close()
+
+    # offline replay of the previous crawl, even though everything is stale
+    fetcher = MonsterFetcher(cache=ResponseCache(cache_path, ttl=0), offline=True)
+    assert fetcher.get(f'{base_url}/1').text == first.text and hits['/1'] == 2
+    try:
+        fetcher.get(f'{base_url}/never-fetched')
+        raise AssertionError('expected a ConnectionError')
+    except ConnectionError:
+        pass
+    fetcher.cache.close()
+
+    # offline without a cache never goes to the network either
+    fetcher = MonsterFetcher(offline=True)
+    try:
+        fetcher.get(f'{base_url}/1')
+        raise AssertionError('expected a ConnectionError')
+    except ConnectionError:
+        pass
+    assert hits['/1'] == 2 and fetcher.stats()['requests'] == 0
+
+    # the least recently used pages are evicted once the cache is full
+    cache = ResponseCache(cache_path, max_bytes=3000)
+    fetcher = MonsterFetcher(cache=cache)
+    for page in ('2', '3', '1', '4'):
+        fetcher.get(f'{base_url}/{page}')
+    assert len(cache) == 2
+    assert cache.get(f'{base_url}/2') is None and cache.get(f'{base_url}/3') is None
+    assert cache.get(f'{base_url}/4') is not None
+    cache.close()
+
+server.shutdown()
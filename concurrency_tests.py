@@ -0,0 +1,55 @@
+from monster import MonsterSearch, JsonlWriter
+from local_monster import LocalMonster
+from time import monotonic
+from tempfile import TemporaryDirectory
+import json
+import os
+
+# Serves canned listing pages from a local server, so description fetching can be tested without hitting Monster
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+job_ids = [job_id for job_id in search.job_ids if len(search.results[job_id].description) > 0][:20]
+dead_ids = set(job_ids[::5])  # every fifth listing has been taken down
+monster = LocalMonster([search.results[job_id] for job_id in job_ids])
+for job_id in dead_ids:
+    del monster.descriptions[job_id]
+
+# point the listings at the local server and throw away their descriptions
+search.job_ids = job_ids
+search.results = dict((job_id, search.results[job_id]) for job_id in job_ids)
+for listing in search:
+    listing.job_url = monster.job_url(listing.job_id)
+    listing.description = ''
+
+tmp_dir = TemporaryDirectory()
+crawl_path = os.path.join(tmp_dir.name, 'crawl.jsonl')
+
+start = monotonic()
+with JsonlWriter(crawl_path, search) as writer:
+    statuses = search.fetch_descriptions(suppress_output=True, max_workers=8, rate_limit=50, burst=8, writer=writer)
+elapsed = monotonic() - start
+
+assert [job_id for job_id, _ in statuses] == job_ids  # results stay in job_ids order
+assert all((status == 'dead') == (job_id in dead_ids) for job_id, status in statuses)
+assert all(len(search.results[job_id].description) > 0 for job_id in job_ids if job_id not in dead_ids)
+assert elapsed < len(job_ids)  # far quicker than one second per listing
+
+# every listing was saved as it was fetched
+assert MonsterSearch.from_jsonl(crawl_path).json_dict()['results'] == search.json_dict()['results']
+with open(crawl_path, 'r') as f:
+    num_lines = len(f.readlines())
+
+# a second pass into the same file finds everything that's alive already present, and only appends the dead ones,
+# which are tried again
+with JsonlWriter(crawl_path, search) as writer:
+    statuses = search.fetch_descriptions(suppress_output=True, rate_limit=50, writer=writer)
+assert [status for _, status in statuses if status != 'dead'] == ['present'] * (len(job_ids) - len(dead_ids))
+with open(crawl_path, 'r') as f:
+    assert len(f.readlines()) == num_lines + len(dead_ids)
+assert MonsterSearch.from_jsonl(crawl_path).json_dict()['results'] == search.json_dict()['results']
+tmp_dir.cleanup()
+
+monster.shutdown()
@@ -0,0 +1,55 @@
+from monster import MonsterSearch, MonsterTextParser, TokenCache
+from helpers import DATA_SCI_KEYWORDS
+from collections import Counter
+from time import perf_counter
+import json
+
+"""
+Compares keyword counting one listing at a time (a Counter updated from words_from_description, as count_words used
+to work) with the batch presence matrix behind count_words, on the saved NYC search scaled up by repetition, and
+with the batch counted again through a warm TokenCache (as when the same listings are analyzed with new keywords).
+"""
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+delete_matching = "[^a-zA-Z.+3]"  # the "." and "3" are for D3.js
+parser = MonsterTextParser(DATA_SCI_KEYWORDS)
+listings = list(search)
+
+
+def per_listing(corpus: list) -> dict:
+    freqs = Counter()
+    for listing in corpus:
+        freqs.update(parser.words_from_description(listing, delete_matching=delete_matching))
+    return dict((x, freqs[x.lower()]) for x in DATA_SCI_KEYWORDS)
+
+
+def batch(corpus: list, batch_parser: MonsterTextParser = parser) -> dict:
+    freqs = batch_parser.presence_matrix(corpus, delete_matching=delete_matching).sum(axis=0).tolist()[0]
+    return dict(zip(DATA_SCI_KEYWORDS, freqs))
+
+
+cached_parser = MonsterTextParser(DATA_SCI_KEYWORDS, token_cache=TokenCache())
+batch(listings, cached_parser)  # warm the cache; the repeated corpora below are made of the same descriptions
+
+print(f'{"listings":>10}{"per-listing (s)":>18}{"batch (s)":>12}{"speedup":>10}{"cached (s)":>12}{"speedup":>10}')
+for copies in (1, 10, 100):
+    corpus = listings * copies
+
+    start = perf_counter()
+    expected = per_listing(corpus)
+    per_listing_time = perf_counter() - start
+
+    start = perf_counter()
+    actual = batch(corpus)
+    batch_time = perf_counter() - start
+
+    start = perf_counter()
+    cached = batch(corpus, cached_parser)
+    cached_time = perf_counter() - start
+
+    assert actual == expected and cached == expected
+    print(f'{len(corpus):>10}{per_listing_time:>18.3f}{batch_time:>12.3f}{per_listing_time / batch_time:>9.1f}x'
+          f'{cached_time:>12.3f}{per_listing_time / cached_time:>9.1f}x')
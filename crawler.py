@@ -0,0 +1,160 @@
+from __future__ import annotations
+from monster import MonsterSearch, MonsterLocation, MonsterFetcher, JsonlWriter
+from concurrent.futures import ThreadPoolExecutor
+from requests.exceptions import RequestException
+from typing import Optional, Union, Iterable
+import json
+import os
+import re
+
+"""
+Runs many Monster searches at once: every query in every location, sharing one rate-limited connection pool,
+fetching each job description only once however many searches turn it up, and checkpointing as it goes.
+"""
+
+
+class CrawlScheduler:
+
+    def __init__(self, queries: Iterable[Union[str, tuple]], locations: Iterable[MonsterLocation], limit: int = 10,
+                 paginate: bool = False, max_searches: int = 4, max_workers: int = 8, host_rate_limit: float = 1.0,
+                 host_burst: int = 1, fetcher: MonsterFetcher = None, checkpoint_dir: str = None,
+                 progress=None, summary_path: str = None):
+        """
+        :param queries: search terms, each either a string or a (query, extra_titles) tuple
+        :param locations: places to run every query in
+        :param limit: number of results pages per search
+        :param paginate: fetch results one page at a time (see MonsterSearch.fetch_listings)
+        :param max_searches: number of searches whose results pages are fetched at once
+        :param max_workers: number of descriptions fetched at once
+        :param host_rate_limit: maximum requests per second to any one host, across every search
+        :param host_burst: requests allowed back to back to one host
+        :param fetcher: HTTP layer shared by every search; by default one is made with host_rate_limit/host_burst.
+        If you pass your own, its own host rate limit applies instead.
+        :param checkpoint_dir: directory where each search is saved as JSON Lines as it progresses. Running again
+        with the same directory picks up where the last run stopped.
+        :param progress: called with (stage, done, total) as searches and descriptions complete. Either way, each step
+        is also sent to the fetcher's CrawlMetrics as a 'progress' event.
+        :param summary_path: at the end of the run, write summary() here as JSON
+        """
+        self.queries = [(x, ()) if isinstance(x, str) else (x[0], tuple(x[1])) for x in queries]
+        self.locations = list(locations)
+        self.limit = limit
+        self.paginate = paginate
+        self.max_searches = max_searches
+        self.max_workers = max_workers
+        self.fetcher = fetcher if fetcher is not None else \
+            MonsterFetcher(pool_size=max(max_searches, max_workers), host_rate_limit=host_rate_limit,
+                           host_burst=host_burst)
+        self.checkpoint_dir = checkpoint_dir
+        self.progress = progress
+        self.summary_path = summary_path
+        self.searches = dict()  # (query, str(location)) -> MonsterSearch
+
+    @staticmethod
+    def search_key(query: str, location: MonsterLocation) -> tuple:
+        return query, str(location)
+
+    def checkpoint_path(self, key: tuple) -> Optional[str]:
+        if self.checkpoint_dir is None:
+            return None
+        name = re.sub('[^a-z0-9]+', '-', ' '.join(key).lower()).strip('-')
+        return os.path.join(self.checkpoint_dir, f'{name}.jsonl')
+
+    def report(self, stage: str, done: int, total: int):
+        self.fetcher.metrics.event('progress', f'{stage}: {done}/{total}', stage=stage, done=done, total=total)
+        if self.progress is not None:
+            self.progress(stage, done, total)
+
+    def run(self) -> dict:
+        """
+        Run every search, then fetch the descriptions of all the listings they found.
+        :return: dictionary of MonsterSearches keyed by (query, "City, ST")
+        """
+        if self.checkpoint_dir is not None:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self.fetch_listings()
+        self.fetch_descriptions()
+        if self.summary_path is not None:
+            with open(self.summary_path, 'w') as f:
+                json.dump(self.summary(), f, indent=2)
+        return self.searches
+
+    def summary(self) -> dict:
+        """
+        :return: per-stage timings from the fetcher's CrawlMetrics, the fetcher's request counters, and the number of
+        listings found by each search
+        """
+        summary = self.fetcher.metrics.summary()
+        summary['fetcher'] = self.fetcher.stats()
+        summary['searches'] = dict((f'{query} in {location}', len(search))
+                                   for (query, location), search in self.searches.items())
+        return summary
+
+    def fetch_listings(self):
+        jobs = [(query, extra_titles, location) for query, extra_titles in self.queries for location in self.locations]
+
+        def run_search(job: tuple) -> MonsterSearch:
+            query, extra_titles, location = job
+            path = self.checkpoint_path(self.search_key(query, location))
+            if path is not None and os.path.exists(path):
+                return MonsterSearch.from_jsonl(path, fetcher=self.fetcher)  # finished in an earlier run
+
+            search = MonsterSearch(location, query, extra_titles=extra_titles, fetcher=self.fetcher)
+            # the fetcher enforces the per-host rate limit, so the search doesn't need its own
+            complete = search.fetch_listings(limit=self.limit, paginate=self.paginate, rate_limit=0)
+            if search.results is None:
+                search.results = dict()
+                search.job_ids = list()
+            # a search that failed partway (or an empty one, which may just have failed) is tried again next time
+            if path is not None and complete and len(search) > 0:
+                search.to_jsonl(path)
+            return search
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_searches)) as executor:
+            for done, ((query, _, location), search) in enumerate(zip(jobs, executor.map(run_search, jobs)), 1):
+                self.searches[self.search_key(query, location)] = search
+                self.report('searches', done, len(jobs))
+
+    def fetch_descriptions(self):
+        # every listing that turned up, grouped by job id, so each description is fetched once
+        copies = dict()  # job id -> [(search key, listing)]
+        for key, search in self.searches.items():
+            for listing in search:
+                copies.setdefault(listing.job_id, list()).append((key, listing))
+
+        # a description already fetched by one search (e.g. in an earlier run) is shared with the others
+        to_fetch = list()
+        for job_id, listings in copies.items():
+            known = next((listing.description for _, listing in listings if listing.description), None)
+            if known is None:
+                to_fetch.append(job_id)
+            else:
+                for _, listing in listings:
+                    listing.description = known
+
+        # only searches that were checkpointed get their descriptions appended: opening a writer would create the
+        # file, and an incomplete search has to be left without one so the next run tries it again
+        writers = dict()
+        if self.checkpoint_dir is not None:
+            writers = dict((key, JsonlWriter(self.checkpoint_path(key), search))
+                           for key, search in self.searches.items() if os.path.exists(self.checkpoint_path(key)))
+
+        def fetch(job_id: str) -> bool:
+            _, listing = copies[job_id][0]
+            try:
+                listing.fetch_description()
+            except RequestException:
+                return False
+            for key, other in copies[job_id]:
+                other.description = listing.description
+                if key in writers:
+                    writers[key].write(other)
+            return True
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                for done, _ in enumerate(executor.map(fetch, to_fetch), 1):
+                    self.report('descriptions', done, len(to_fetch))
+        finally:
+            for writer in writers.values():
+                writer.close()
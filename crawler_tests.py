@@ -0,0 +1,89 @@
+from monster import MonsterSearch, MonsterLocation, MonsterFetcher, MonsterListing, CrawlMetrics
+from crawler import CrawlScheduler
+from local_monster import LocalMonster
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from time import monotonic
+import json
+import os
+
+# Runs a two-query, two-city crawl against a local stand-in for Monster
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    saved = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+listings = [saved.results[job_id] for job_id in saved.job_ids[:60]]
+cities = {'New-York__2C-NY': 'New York, NY', 'Boston__2C-MA': 'Boston, MA'}
+
+
+def in_city(listing: MonsterListing, city: str) -> MonsterListing:
+    # the same job, posted in another city under its own job id
+    return MonsterListing(f'{listing.job_id}{city[:3]}', '', MonsterLocation.get_from_string(city), listing.company,
+                          listing.job_title, listing.description)
+
+
+# "data scientist" and "data engineer" searches share twenty listings; New York and Boston share none
+search_pages = dict(((query, where), [in_city(x, city) for x in found])
+                    for query, found in (('data-scientist', listings[:40]), ('data-engineer', listings[20:60]))
+                    for where, city in cities.items())
+monster = LocalMonster([x for page in search_pages.values() for x in page],
+                       select=lambda params: search_pages[(params['q'][0], params['where'][0])])
+MonsterSearch.SEARCH_URL = monster.search_url
+
+queries = [('Data Scientist', ('Data Science',)), ('Data Engineer', ('Data Engineering',))]
+locations = [MonsterLocation.from_string('New York, NY'), MonsterLocation.from_string('Boston, MA')]
+progress = list()
+
+with TemporaryDirectory() as tmp_dir:
+    scheduler = CrawlScheduler(queries, locations, max_searches=4, max_workers=8, host_rate_limit=200, host_burst=8,
+                               checkpoint_dir=tmp_dir, progress=lambda *args: progress.append(args))
+    searches = scheduler.run()
+
+    assert len(searches) == 4
+    new_york = searches[('Data Scientist', 'New York, NY')]
+    assert len(new_york) == len([x for x in listings[:40] if 'Data Scien' in x.job_title])
+    assert all(len(listing.description) > 0 for search in searches.values() for listing in search)
+
+    # each description was fetched once, even the ones both queries found
+    unique_ids = set(listing.job_id for search in searches.values() for listing in search)
+    assert len(monster.job_requests()) == len(unique_ids)
+    assert progress[-1] == ('descriptions', len(unique_ids), len(unique_ids))
+
+    # a second run with the same checkpoints has nothing left to do
+    monster.requests.clear()
+    events = list()
+    quiet = MonsterFetcher(metrics=CrawlMetrics(on_event=events.append))
+    resumed = CrawlScheduler(queries, locations, fetcher=quiet, checkpoint_dir=tmp_dir).run()
+    assert len(monster.job_requests()) == 0
+    # progress went to the fetcher's metrics rather than stdout
+    assert events[-1] == {'event': 'progress', 'message': 'searches: 4/4', 'stage': 'searches', 'done': 4, 'total': 4}
+    assert all(resumed[key].json_dict()['results'] == searches[key].json_dict()['results'] for key in searches)
+
+# a search whose results page fails isn't checkpointed, so the next run runs it again
+with TemporaryDirectory() as tmp_dir:
+    def scheduler() -> CrawlScheduler:
+        fetcher = MonsterFetcher(max_retries=1, backoff_factor=0.01, metrics=CrawlMetrics(on_event=None))
+        return CrawlScheduler(queries, locations, limit=5, paginate=True, max_searches=1, fetcher=fetcher,
+                              checkpoint_dir=tmp_dir)
+
+    key = ('Data Scientist', 'New York, NY')
+    monster.failures[2] = [503, 503]  # the second page of the first search
+    partial = scheduler()
+    assert 0 < len(partial.run()[key]) < len(new_york)
+    assert not os.path.exists(partial.checkpoint_path(key))
+
+    monster.requests.clear()
+    retried = scheduler().run()
+    assert len(monster.page_requests()) > 0
+    assert retried[key].json_dict()['results'] == new_york.json_dict()['results']
+
+# the per-host limit holds across threads
+fetcher = MonsterFetcher(host_rate_limit=20)
+start = monotonic()
+with ThreadPoolExecutor(max_workers=8) as executor:
+    list(executor.map(fetcher.get, [monster.job_url(x.job_id) for x in search_pages[('data-scientist',
+                                                                                    'New-York__2C-NY')][:21]]))
+assert monotonic() - start >= 1.0  # 20 requests after the first, at 20 per second
+
+monster.shutdown()
@@ -0,0 +1,62 @@
+from monster import MonsterFetcher, MonsterListing, MonsterLocation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from requests.exceptions import HTTPError
+from threading import Thread
+
+# Checks that MonsterFetcher retries transient errors and keeps count of what it did, using a local server
+
+attempts = dict()
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connections can be reused
+
+    def do_GET(self):
+        attempts[self.path] = attempts.get(self.path, 0) + 1
+        if self.path == '/down' or (self.path == '/flaky' and attempts[self.path] < 3):
+            status, body = 503, b'Service Unavailable'
+        else:
+            status, body = 200, b'<html><body><div id="JobDescription">Python and SQL</div></body></html>'
+        self.send_response(status)
+        if status == 503:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+Thread(target=server.serve_forever, daemon=True).start()
+base_url = f'http://127.0.0.1:{server.server_port}'
+
+fetcher = MonsterFetcher(max_retries=3, backoff_factor=0.01)
+
+# two 503s and then a success
+response = fetcher.get(f'{base_url}/flaky')
+assert response.status_code == 200
+assert fetcher.stats()['requests'] == 3 and fetcher.stats()['retries'] == 2
+
+listing = MonsterListing('1', f'{base_url}/listing', MonsterLocation('New York', 'NY'), 'WeWork', 'Data Scientist',
+                         fetcher=fetcher)
+listing.fetch_description()
+assert listing.description == 'Python and SQL'
+
+# a server that never recovers raises instead of making the listing look dead
+listing.job_url = f'{base_url}/down'
+try:
+    listing.fetch_description()
+    raise AssertionError('expected an HTTPError')
+except HTTPError:
+    pass
+assert attempts['/down'] == 4
+
+stats = fetcher.stats()
+assert stats['failures'] == 1
+assert stats['requests'] == sum(stats['latency_histogram'].values()) == 8
+assert stats['bytes'] > 0
+
+fetcher.close()
+server.shutdown()
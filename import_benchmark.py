@@ -0,0 +1,43 @@
+from statistics import median
+import subprocess
+import sys
+
+"""
+Wall-clock time for a fresh Python process to do a few common jobs, now that monster.py imports requests,
+BeautifulSoup, numpy, scipy, pandas and nltk only when it needs them. "eager" imports all of them up front, as
+monster.py used to. Also lists which of the heavy packages each job ended up loading.
+"""
+
+runs = 5
+heavy = ('requests', 'bs4', 'numpy', 'scipy', 'pandas', 'nltk')
+
+jobs = [
+    ('import monster', 'import monster'),
+    ('import monster (eager)',
+     'import requests, bs4, numpy, scipy.sparse, pandas, nltk.corpus\n'
+     'import monster'),
+    ('load a saved search',
+     'from monster import MonsterSearch\n'
+     'search = MonsterSearch.load("./data/data_scientist_nyc_search.json")'),
+    ('look up a metro area',
+     'from monster import MonsterLocation\n'
+     'location = MonsterLocation.from_metro("New York, NY")'),
+    ('count keywords',
+     'from monster import MonsterSearch, MonsterTextParser\n'
+     'from helpers import DATA_SCI_KEYWORDS\n'
+     'search = MonsterSearch.load("./data/data_scientist_nyc_search.json")\n'
+     'MonsterTextParser(DATA_SCI_KEYWORDS).count_words(search)'),
+]
+
+report = f'import sys\nprint(",".join(x for x in {heavy!r} if x in sys.modules))'
+
+print(f'{"job":<28}{"seconds":>10}  heavy packages loaded')
+for name, code in jobs:
+    times = list()
+    for _ in range(runs):
+        script = f'from time import perf_counter\nstart = perf_counter()\n{code}\n' \
+                 f'print(perf_counter() - start)\n{report}'
+        out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        seconds, loaded = out.splitlines()
+        times.append(float(seconds))
+    print(f'{name:<28}{median(times):>10.3f}  {loaded or "-"}')
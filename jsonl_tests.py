@@ -0,0 +1,75 @@
+from monster import MonsterSearch, JsonlWriter
+from tempfile import TemporaryDirectory
+import json
+import os
+
+# Checks that searches survive a round trip through JSON Lines, compressed or not, and that partial files are usable
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+with TemporaryDirectory() as tmp_dir:
+    for name in ('search.jsonl', 'search.jsonl.gz'):
+        path = os.path.join(tmp_dir, name)
+        search.to_jsonl(path)
+
+        new_search = MonsterSearch.from_jsonl(path)
+        assert new_search.json_dict() == search.json_dict()
+
+        # listings can be read one at a time, without loading the whole file
+        listings = MonsterSearch.iter_jsonl(path)
+        assert next(listings).job_id == search.job_ids[0]
+        assert MonsterSearch.read_jsonl_header(path)['query'] == search.query
+
+    # descriptions can stay on disk until they're needed
+    path = os.path.join(tmp_dir, 'search.jsonl')
+    lazy_search = MonsterSearch.from_jsonl(path, lazy=True)
+    listing = lazy_search.results[search.job_ids[5]]
+    assert listing.description_text is None
+    assert listing.description == search.results[search.job_ids[5]].description
+    listing.evict_description()
+    assert listing.description_text is None and len(listing.description) > 0
+    assert lazy_search.json_dict() == search.json_dict()
+
+    # a crawl that writes as it goes and then dies mid-record
+    path = os.path.join(tmp_dir, 'crawl.jsonl')
+    with JsonlWriter(path, search) as writer:
+        for listing in list(search)[:10]:
+            writer.write(listing)
+    with JsonlWriter(path, search) as writer:  # appending doesn't write a second header
+        writer.write(search.results[search.job_ids[10]])
+        writer.write(search.results[search.job_ids[0]])  # written twice: the last copy wins
+    with open(path, 'a') as f:
+        f.write('{"type": "listing", "listing": {"job_id": "12')
+
+    partial = MonsterSearch.from_jsonl(path)
+    assert partial.job_ids == search.job_ids[:11]
+    assert all(partial.results[job_id] == search.results[job_id] for job_id in partial.job_ids)
+
+    # the crawl is resumed after dying mid-record: the partial record is dropped rather than run into the next one
+    with JsonlWriter(path, search) as writer:
+        for listing in list(search)[11:50]:
+            writer.write(listing)
+    resumed = MonsterSearch.from_jsonl(path)
+    assert resumed.job_ids == search.job_ids[:50]
+    assert all(resumed.results[job_id] == search.results[job_id] for job_id in resumed.job_ids)
+
+    # compressed files can't be truncated, so the writer starts a fresh line and the reader skips the partial one
+    path = os.path.join(tmp_dir, 'crawl.jsonl.gz')
+    with JsonlWriter(path, search) as writer:
+        for listing in list(search)[:10]:
+            writer.write(listing)
+        writer.file.write('{"type": "listing", "listing": {"job_id": "12')
+    with JsonlWriter(path, search) as writer:
+        for listing in list(search)[10:50]:
+            writer.write(listing)
+    assert MonsterSearch.from_jsonl(path).job_ids == search.job_ids[:50]
+
+    # a crash before the header was finished leaves nothing to keep
+    path = os.path.join(tmp_dir, 'empty.jsonl')
+    with open(path, 'w') as f:
+        f.write('{"type": "sea')
+    with JsonlWriter(path, search) as writer:
+        writer.write(search.results[search.job_ids[0]])
+    assert MonsterSearch.from_jsonl(path).job_ids == search.job_ids[:1]
@@ -0,0 +1,108 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from threading import Thread, Lock
+from time import sleep, monotonic
+from html import escape
+
+"""
+A local stand-in for monster.com, shared by the tests: serves results pages and job pages built from saved listings,
+and can be told to fail any of them, so crawls can be tested without the network.
+"""
+
+
+class LocalMonster:
+
+    def __init__(self, listings: list, per_page: int = 25, search_delay: float = 0.0, select=None):
+        """
+        :param listings: listings the search turns up, in order
+        :param per_page: listings per results page
+        :param search_delay: seconds each results page takes to arrive
+        :param select: called with a search's query parameters (e.g. {'q': ['data-scientist'], 'where': [...]});
+        returns the listings that search turns up instead of `listings`
+        """
+        self.listings = list(listings)
+        self.descriptions = dict((x.job_id, x.description) for x in self.listings)  # job ids left out are dead
+        self.per_page = per_page
+        self.search_delay = search_delay
+        self.select = select
+        self.failures = dict()  # results page number or job id -> statuses to send before the real page
+        self.requests = list()  # (results page number or job id, time) for every request
+        self.lock = Lock()
+
+        monster = self
+
+        class MonsterHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                monster.respond(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), MonsterHandler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.search_url = f'{self.url}/jobs/search/'  # for MonsterSearch.SEARCH_URL
+        Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def job_url(self, job_id: str) -> str:
+        return f'{self.url}/job/{job_id}'
+
+    def search_result(self, listing) -> str:
+        return f'<section data-jobid="{listing.job_id}"><div class="summary">' \
+            f'<h2 class="title"><a href="{self.job_url(listing.job_id)}">{escape(listing.job_title)}</a></h2>' \
+            f'<div class="company"><span class="name">{escape(listing.company)}</span></div>' \
+            f'<div class="location"><span class="name">{listing.location}</span></div></div></section>'
+
+    def results_page(self, params: dict) -> list:
+        """
+        :return: the listings on results pages stpage..page of the search
+        """
+        listings = self.listings if self.select is None else self.select(params)
+        num_pages = max(1, (len(listings) + self.per_page - 1) // self.per_page)
+        last = int(params['page'][0])
+        first = int(params.get('stpage', params['page'])[0])
+        if first > num_pages:
+            first = last = num_pages  # like Monster, repeat the last page when asked to go past the end
+        return listings[(first - 1) * self.per_page:last * self.per_page]
+
+    def respond(self, handler: BaseHTTPRequestHandler):
+        url = urlparse(handler.path)
+        if url.path.startswith('/job/'):
+            key = url.path[len('/job/'):]
+            description = self.descriptions.get(key)
+            page = 'This job is no longer available.' if description is None else \
+                f'<div id="JobDescription">{escape(description)}</div>'
+        else:
+            sleep(self.search_delay)
+            params = parse_qs(url.query)
+            key = int(params['page'][0])
+            page = ''.join(self.search_result(x) for x in self.results_page(params))
+
+        with self.lock:
+            self.requests.append((key, monotonic()))
+            statuses = self.failures.get(key)
+            status = statuses.pop(0) if statuses else 200
+        body = f'<html><body>{page}</body></html>' if status == 200 else 'try again later'
+        body = body.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def page_requests(self) -> list:
+        """
+        :return: the page number of every results page requested, in order
+        """
+        with self.lock:
+            return [key for key, _ in self.requests if isinstance(key, int)]
+
+    def job_requests(self) -> list:
+        """
+        :return: the job id of every job page requested, in order
+        """
+        with self.lock:
+            return [key for key, _ in self.requests if isinstance(key, str)]
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,37 @@
+from monster import MonsterLocation, MonsterListing, MonsterSearch
+import json
+
+# Checks the location index: hashing, shared locations, metro areas and O(1) listing validation
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+new_york = MonsterLocation.from_metro('new york, ny')
+assert str(new_york) == 'New York, NY'
+assert MonsterLocation('Brooklyn', 'NY').matches(new_york) and new_york.matches(MonsterLocation('Brooklyn', 'NY'))
+assert MonsterLocation('Jersey City', 'NJ') in new_york.alternates
+assert not MonsterLocation('Boston', 'MA').matches(new_york)
+assert len(MonsterLocation.from_metro('Springfield, IL').alternates) == 0  # not a metro area we know about
+
+# locations can go in sets and dicts, keyed on the exact (city, state)
+assert len({MonsterLocation('new york', 'ny'), MonsterLocation('New York', 'NY'), new_york}) == 1
+assert {new_york: 1}[MonsterLocation('New York', 'NY')] == 1
+brooklyn = MonsterLocation('Brooklyn', 'NY')
+assert brooklyn != new_york and brooklyn not in {new_york} and brooklyn not in [new_york]  # == agrees with hash
+
+# listings in the same place share one location
+assert MonsterLocation.get('Brooklyn', 'NY') is MonsterLocation.get_from_string('Brooklyn, NY')
+assert MonsterLocation.get('brooklyn', 'ny') is MonsterLocation.get('Brooklyn', 'NY')  # however it's spelled
+locations = set(id(listing.location) for listing in search)
+assert len(locations) == len(set(listing.location.key for listing in search))
+
+# the metro table accepts everything the hand-written alternates did
+assert all(search.is_valid_listing(listing) for listing in search)
+assert all(MonsterSearch(new_york, search.query, extra_titles=search.extra_titles).is_valid_listing(listing)
+           for listing in search)
+
+boston = MonsterListing('1', 'https://job-openings.monster.com/1', MonsterLocation.get('Cambridge', 'MA'),
+                        'Acme', 'Data Scientist')
+assert not search.is_valid_listing(boston)
+assert MonsterSearch(MonsterLocation.from_metro('Boston, MA'), 'Data Scientist').is_valid_listing(boston)
@@ -11,7 +11,7 @@ job_id = '208183191'
 listing = MonsterListing.from_id(job_id)
 listing.fetch_description()  # get description from webpage
 
-assert listing.location == location  # should be true, because "Brooklyn, NY" is listed as an alternate location
+assert location.matches(listing.location)  # should be true, because "Brooklyn, NY" is listed as an alternate location
 
 assert MonsterListing.json_deserialize(in_str=listing.json_serialize()) == listing
 
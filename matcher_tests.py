@@ -0,0 +1,44 @@
+from monster import KeywordMatcher, MonsterSearch, MonsterTextParser
+from helpers import DATA_SCI_KEYWORDS
+from time import perf_counter
+import json
+
+# Checks that KeywordMatcher finds multi-word and symbol keywords as whole words
+
+matcher = KeywordMatcher(('R', 'Python', 'Java', 'JavaScript', 'C', 'C++', 'D3', 'D3.js', 'Machine Learning',
+                          'Learning', 'Data Science', '.NET'))
+
+text = 'Experience with python, JavaScript (D3.js) and C++ for machine\n learning. R&D on Data  Science teams.'
+assert matcher.find(text) == {'python', 'javascript', 'd3.js', 'c++', 'machine learning', 'learning', 'r',
+                              'data science'}
+
+# keywords only match whole words
+assert matcher.find('React, ASP.NET, Javanese, Rust') == set()
+assert matcher.find('.NET and D3, plus C.') == {'.net', 'd3', 'c'}
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+# on single-word keywords, phrase matching agrees closely with the tokenizer
+keywords = tuple(x for x in DATA_SCI_KEYWORDS if x.isalpha())
+parser = MonsterTextParser(keywords)
+tokens = parser.count_words(search).set_index('Keyword')['Frequency']
+phrases = parser.count_words(search, match_phrases=True).set_index('Keyword')['Frequency']
+assert all(abs(tokens[x] - phrases[x]) <= 0.05 * len(search) for x in keywords)
+
+# thousands of keywords cost about the same per description as a few dozen
+few = KeywordMatcher(DATA_SCI_KEYWORDS)
+many = KeywordMatcher(list(DATA_SCI_KEYWORDS) + [f'skill {i}' for i in range(5000)])
+descriptions = [listing.description for listing in search]
+
+start = perf_counter()
+few_found = [few.find(x) for x in descriptions]
+few_time = perf_counter() - start
+
+start = perf_counter()
+many_found = [many.find(x) for x in descriptions]
+many_time = perf_counter() - start
+
+assert few_found == many_found
+assert many_time < 5 * few_time
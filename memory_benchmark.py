@@ -0,0 +1,75 @@
+from monster import MonsterSearch, MonsterLocation, JsonlWriter
+from tempfile import TemporaryDirectory
+import tracemalloc
+import json
+import gc
+import os
+
+"""
+Bytes per listing when a large search is held in memory, for
+- listings built the way the original MonsterListing was: a __dict__ per object, a fresh MonsterLocation each, and
+  company/title strings that aren't shared
+- the current slotted MonsterListing with shared locations and interned strings, descriptions loaded
+- the same, loaded lazily from JSON Lines, with descriptions left on disk
+The search is generated by repeating the listings in data/data_scientist_nyc_search.json under new job IDs.
+"""
+
+num_listings = 50000
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+
+class DictListing:
+    # what MonsterListing used to store
+    def __init__(self, job_id, job_url, location, company, job_title, description):
+        self.job_id = job_id
+        self.job_url = job_url
+        self.location = location
+        self.company = company
+        self.job_title = job_title
+        self.description = description
+
+
+def load_dict_listings(path: str) -> list:
+    listings = list()
+    with open(path, 'r') as f:
+        next(f)  # header
+        for line in f:
+            record = json.loads(line)['listing']
+            city, state = [x.strip() for x in record['location'].split(',')]
+            listings.append(DictListing(record['job_id'], record['job_url'], MonsterLocation(city, state),
+                                        record['company'], record['job_title'], record['description']))
+    return listings
+
+
+def bytes_per_listing(load) -> float:
+    gc.collect()
+    tracemalloc.start()
+    loaded = load()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(loaded) == num_listings
+    return size / num_listings
+
+
+with TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'big_search.jsonl')
+    originals = list(search)
+    with JsonlWriter(path, search, append=False) as writer:
+        for i in range(num_listings):
+            listing = originals[i % len(originals)]
+            record = listing.json_dict()
+            record['job_id'] = str(10 ** 9 + i)
+            writer.write_record({'type': 'listing', 'listing': record})
+
+    results = [('dict-backed (original)', bytes_per_listing(lambda: load_dict_listings(path))),
+               ('slotted, descriptions loaded', bytes_per_listing(lambda: list(MonsterSearch.iter_jsonl(path)))),
+               ('slotted, lazy descriptions', bytes_per_listing(lambda: list(MonsterSearch.iter_jsonl(path,
+                                                                                                     lazy=True))))]
+
+print(f'{num_listings} listings')
+for name, size in results:
+    print(f'{name:<32}{size:>12,.0f} bytes/listing')
@@ -0,0 +1,69 @@
+from monster import MonsterSearch, MonsterFetcher, MonsterTextParser, CrawlMetrics
+from helpers import DATA_SCI_KEYWORDS
+from local_monster import LocalMonster
+from tempfile import TemporaryDirectory
+from contextlib import redirect_stdout
+from io import StringIO
+import pstats
+import json
+import os
+
+# Fetches descriptions from a local server with a CrawlMetrics attached and checks what ends up in the summary
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+job_ids = [job_id for job_id in search.job_ids if len(search.results[job_id].description) > 0][:10]
+descriptions = dict((job_id, search.results[job_id].description) for job_id in job_ids)
+monster = LocalMonster([search.results[job_id] for job_id in job_ids])
+monster.failures[job_ids[0]] = [503]  # one 503 before the real page
+
+events = list()
+metrics = CrawlMetrics(on_event=events.append)
+search.fetcher = MonsterFetcher(backoff_factor=0.01, metrics=metrics)
+search.job_ids = job_ids
+search.results = dict((job_id, search.results[job_id]) for job_id in job_ids)
+for listing in search:
+    listing.fetcher = search.fetcher
+    listing.job_url = monster.job_url(listing.job_id)
+    listing.description = ''
+
+# progress goes to the callback, not stdout
+stdout = StringIO()
+with redirect_stdout(stdout), TemporaryDirectory() as tmp_dir:
+    profile_path = os.path.join(tmp_dir, 'crawl.prof')
+    with metrics.profile(path=profile_path):
+        statuses = search.fetch_descriptions(rate_limit=0)
+    assert pstats.Stats(profile_path).total_calls > 0
+assert stdout.getvalue() == ''
+assert all(status == 'fetched' for _, status in statuses)
+assert [(x['event'], x['index'], x['status']) for x in events] == [('description', i, 'fetched')
+                                                                    for i in range(1, len(job_ids) + 1)]
+assert events[0]['message'] == 'Description #1 successfully fetched.' and events[0]['job_id'] == job_ids[0]
+
+summary = json.loads(metrics.json_summary())
+stages = summary['stages']
+assert stages['request']['count'] == len(job_ids) + 1 and stages['request']['errors'] == 1  # one 503, retried
+assert stages['backoff']['count'] == 1
+assert stages['parse_description']['count'] == len(job_ids)
+assert stages['request']['bytes'] == search.fetcher.stats()['bytes']
+assert stages['parse_description']['bytes'] > sum(len(x.encode('utf-8')) for x in descriptions.values())
+assert stages['rate_limit_wait']['count'] == len(job_ids)
+assert any('fetch_descriptions' in x['function'] for x in summary['profile'])
+
+# counting is timed by the parser's own metrics
+parser_metrics = CrawlMetrics()
+parser = MonsterTextParser(DATA_SCI_KEYWORDS, metrics=parser_metrics)
+parser.count_words(search)
+stages = parser_metrics.summary()['stages']
+assert stages['count']['count'] == 1
+assert stages['keywords']['count'] == stages['clean']['count'] == len(job_ids)
+assert stages['count']['seconds'] >= stages['keywords']['seconds'] >= stages['clean']['seconds']
+
+# misuse is reported through the callback too
+events.clear()
+search.fetch_listings()
+assert events[0]['event'] == 'warning'
+
+monster.shutdown()
@@ -1,19 +1,36 @@
 from __future__ import annotations
-import requests
-from typing import Optional, Union
-from bs4 import BeautifulSoup
-from collections import Counter
+from typing import Optional, Union, Iterable, TYPE_CHECKING
 from helpers import NA
-from bs4.element import Tag
 import json
-from time import sleep
-from requests.exceptions import ConnectionError
-from urllib3.exceptions import MaxRetryError, NewConnectionError
+import gzip
+import hashlib
+import os
+import sqlite3
+from time import sleep, monotonic, time, perf_counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import islice
+from collections import OrderedDict, deque
+from threading import Lock
+from contextlib import contextmanager, nullcontext
+import cProfile
+import pstats
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from datetime import datetime, timezone
+import random
+import sys
 from socket import gaierror
 import re
-from nltk.corpus import stopwords
-from pandas import DataFrame
-import pandas as pd
+
+# requests, BeautifulSoup, numpy, scipy, pandas and nltk take a couple of seconds to import between them, so each is
+# imported where it's first needed: loading a saved search or working with locations doesn't need any of them.
+# See import_benchmark.py.
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup, SoupStrainer
+    from bs4.element import Tag
+    from pandas import DataFrame
+    from scipy.sparse import csr_matrix
 
 """
 Classes that allow us to scrape Monster.com listings
@@ -22,82 +39,1190 @@ His blog post: https://jessesw.com/Data-Science-Skills/
 """
 
 
+# Only these parts of a page are ever looked at, so there's no point building a tree for anything else.
+# The SoupStrainers themselves are built on first use; see strainer().
+STRAINERS = {'SEARCH_RESULTS_STRAINER': ('section', {'data-jobid': True}),
+             'JOB_DESCRIPTION_STRAINER': ('div', {'id': 'JobDescription'})}
+built_strainers = dict()  # name -> SoupStrainer
+
+DEFAULT_PARSER = 'html.parser'  # 'lxml' is considerably faster if it's installed
+
+
+def strainer(name: str) -> SoupStrainer:
+    """
+    :param name: a key of STRAINERS
+    :return: the SoupStrainer of that name, built the first time it's asked for
+    """
+    if name not in built_strainers:
+        from bs4 import SoupStrainer
+
+        tag, attrs = STRAINERS[name]
+        built_strainers[name] = SoupStrainer(tag, attrs=attrs)
+    return built_strainers[name]
+
+
+def __getattr__(name: str):
+    # keeps `from monster import SEARCH_RESULTS_STRAINER` working without importing bs4 up front
+    if name in STRAINERS:
+        return strainer(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+stop_words_cache = dict()  # language -> frozenset, so nltk's corpus is only read once per process
+
+
+def get_stop_words(language: str = 'english') -> frozenset:
+    """
+    :return: nltk's stop words for language
+    """
+    if language not in stop_words_cache:
+        from nltk.corpus import stopwords  # by far the slowest import, so only done once text is tokenized
+
+        stop_words_cache[language] = frozenset(stopwords.words(language))
+    return stop_words_cache[language]
+
+
+def network_errors() -> tuple:
+    """
+    :return: the exceptions a failed request can raise
+    """
+    from requests.exceptions import ConnectionError, RequestException
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+    return gaierror, ConnectionError, MaxRetryError, NewConnectionError, RequestException
+
+
+def make_soup(markup: str, parser: str = DEFAULT_PARSER, parse_only: SoupStrainer = None) -> BeautifulSoup:
+    """
+    :param markup: HTML to parse
+    :param parser: BeautifulSoup tree builder, e.g. 'html.parser' or 'lxml'
+    :param parse_only: only build the tree for elements matching this strainer (and their contents)
+    :return: parsed page
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(markup, parser, parse_only=parse_only)
+
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of a set of keywords in a text in a single scan. Keywords may contain spaces and
+    symbols ("Machine Learning", "C++", "D3.js") and are matched case-insensitively as whole words, i.e. not
+    preceded or followed by a letter or digit.
+
+    The keywords are compiled into one regex shaped like a trie, so the work done at each position of the text
+    depends on the length of the keywords rather than how many there are.
+    """
+
+    WORD_CHAR = r'[^\W_]'  # letter or digit
+
+    def __init__(self, keywords):
+        """
+        :param keywords: keywords to look for
+        """
+        self.keywords = [self.normalize(x) for x in keywords]
+        self.trie = dict()
+        for keyword in self.keywords:
+            if len(keyword) == 0:
+                continue
+            node = self.trie
+            for char in keyword:
+                node = node.setdefault(char, dict())
+            node[''] = True  # '' marks the end of a keyword
+
+        # at every position that isn't inside a word, capture the longest keyword that ends at a word boundary.
+        # the match itself is empty, so the scan carries on from the next character and finds overlapping keywords
+        self.regex = re.compile(f'(?<!{self.WORD_CHAR})(?=({self.trie_pattern(self.trie)})(?!{self.WORD_CHAR}))',
+                                re.IGNORECASE)
+
+    @staticmethod
+    def normalize(keyword: str) -> str:
+        return ' '.join(keyword.lower().split())
+
+    @classmethod
+    def trie_pattern(cls, node: dict) -> str:
+        alternatives = list()
+        for char in sorted(x for x in node if x != ''):
+            char_pattern = r'\s+' if char == ' ' else re.escape(char)
+            alternatives.append(char_pattern + cls.trie_pattern(node[char]))
+        if len(alternatives) == 0:
+            return ''
+        pattern = alternatives[0] if len(alternatives) == 1 else f'(?:{"|".join(alternatives)})'
+        if '' in node:
+            pattern = f'(?:{pattern})?'  # a keyword ends here, but a longer one may carry on
+        return pattern
+
+    def find(self, text: str) -> set:
+        """
+        :param text: text to search
+        :return: set of (normalized) keywords that occur in the text. Only the longest keyword starting at any one
+        position counts ("C++" is not also "C"), but keywords starting inside another are found too ("Learning" in
+        "Machine Learning").
+        """
+        return set(self.normalize(match.group(1)) for match in self.regex.finditer(text))
+
+
+class TokenCache:
+    """
+    The words in job descriptions, keyed by a hash of (description, delete_matching), so a description that's
+    analyzed again (with other keywords, or because it turned up in another search) isn't cleaned and split again.
+    Share one between MonsterTextParsers to get the benefit across keyword tuples.
+
+    The most recently used `max_entries` are kept in memory. Given a path, entries are also written to a SQLite file
+    so later runs can start warm; the file keeps the `max_stored` most recently used, so a cache that's shared by
+    every run (e.g. the pipeline's --cache-dir) doesn't grow forever.
+    """
+
+    FLUSH_EVERY = 1000  # entries written to disk per transaction
+
+    def __init__(self, max_entries: int = 10000, path: str = None, max_stored: int = 100000):
+        """
+        :param max_entries: number of descriptions kept in memory
+        :param path: SQLite file to persist entries in, or None to keep them in memory only
+        :param max_stored: number of descriptions kept in the file; the least recently used go first
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.max_stored = max_stored
+        self.entries = OrderedDict()  # key -> frozenset of words, least recently used first
+        self.pending = dict()  # key -> words not yet written to disk
+        self.touched = set()  # keys read back from disk whose use isn't recorded there yet
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        self.conn = None
+        if path is not None:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            with self.conn:
+                self.conn.execute('CREATE TABLE IF NOT EXISTS tokens (key BLOB PRIMARY KEY, words TEXT, '
+                                  'used_at REAL)')
+                if 'used_at' not in [row[1] for row in self.conn.execute('PRAGMA table_info(tokens)')]:
+                    self.conn.execute('ALTER TABLE tokens ADD COLUMN used_at REAL DEFAULT 0')  # an older file
+                self.conn.execute('CREATE INDEX IF NOT EXISTS tokens_used_at ON tokens (used_at)')
+
+    @staticmethod
+    def key(description: str, delete_matching: str) -> bytes:
+        digest = hashlib.blake2b(delete_matching.encode('utf-8'), digest_size=16)
+        digest.update(b'\0')
+        digest.update(description.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[frozenset]:
+        """
+        :return: the words stored under key, or None if there aren't any
+        """
+        with self.lock:
+            words = self.entries.get(key)
+            if words is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return words
+            if self.conn is not None:
+                words = self.pending.get(key)
+                if words is None:
+                    row = self.conn.execute('SELECT words FROM tokens WHERE key = ?', (key,)).fetchone()
+                    if row is not None:
+                        words = frozenset(sys.intern(x) for x in json.loads(row[0]))
+                        self.touched.add(key)
+                        if len(self.touched) >= self.FLUSH_EVERY:
+                            self.write_pending()
+                if words is not None:
+                    self.remember(key, words)
+                    self.hits += 1
+                    return words
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, words: Iterable):
+        # interned, as most words turn up in many descriptions
+        words = frozenset(sys.intern(x) for x in words)
+        with self.lock:
+            self.remember(key, words)
+            if self.conn is not None:
+                self.pending[key] = words
+                if len(self.pending) >= self.FLUSH_EVERY:
+                    self.write_pending()
+
+    def remember(self, key: bytes, words: frozenset):
+        # caller holds the lock
+        self.entries[key] = words
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def write_pending(self):
+        # caller holds the lock
+        now = time()
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)',
+                                  ((key, json.dumps(sorted(words)), now) for key, words in self.pending.items()))
+            self.conn.executemany('UPDATE tokens SET used_at = ? WHERE key = ?', ((now, key) for key in self.touched))
+            self.evict()
+        self.pending = dict()
+        self.touched = set()
+
+    def evict(self):
+        # caller holds the lock
+        stored = self.conn.execute('SELECT COUNT(*) FROM tokens').fetchone()[0]
+        if stored > self.max_stored:
+            self.conn.execute('DELETE FROM tokens WHERE key IN (SELECT key FROM tokens ORDER BY used_at LIMIT ?)',
+                              (stored - self.max_stored,))
+
+    def flush(self):
+        """
+        Write any entries still held back to disk, and when entries were used.
+        """
+        with self.lock:
+            if self.conn is not None and len(self.pending) + len(self.touched) > 0:
+                self.write_pending()
+
+    def stored(self) -> int:
+        """
+        :return: number of descriptions in the file, once everything held back is written
+        """
+        self.flush()
+        with self.lock:
+            if self.conn is None:
+                return 0
+            return self.conn.execute('SELECT COUNT(*) FROM tokens').fetchone()[0]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+
 class MonsterTextParser:
-    def __init__(self, keywords: tuple):
+    def __init__(self, keywords: tuple, metrics: CrawlMetrics = None, stop_words: frozenset = None,
+                 token_cache: TokenCache = None):
+        """
+        :param keywords: keywords to look for in job descriptions
+        :param metrics: if given, time spent counting, matching and cleaning text is recorded here
+        :param stop_words: words that are never counted; nltk's English stop words by default
+        :param token_cache: if given, the words in each description are looked up here before cleaning and
+        splitting it. Not used by worker processes when counting with workers > 1.
+        """
         self.keywords = keywords
+        self.metrics = metrics
+        self.token_cache = token_cache
+
+        # compiled once per parser rather than once per listing
+        self.keywords_lower = [x.lower() for x in keywords]
+        self.keyword_set = frozenset(self.keywords_lower)
+        self.stop_words = get_stop_words() if stop_words is None else frozenset(stop_words)
+        self.patterns = dict()  # delete_matching -> compiled regex
+        self.word_patterns = dict()  # delete_matching -> compiled regex matching whole words, if there is one
+        self.matcher = None  # KeywordMatcher, built the first time phrases are matched
+
+        # keyword -> every column (position in keywords) it appears in, for tokens and for phrases
+        self.word_columns = dict()
+        for j, keyword in enumerate(self.keywords_lower):
+            if keyword not in self.stop_words:
+                self.word_columns.setdefault(keyword, list()).append(j)
+        self.phrase_columns = dict()
+        for j, keyword in enumerate(keywords):
+            self.phrase_columns.setdefault(KeywordMatcher.normalize(keyword), list()).append(j)
+
+    def stage(self, name: str):
+        return nullcontext() if self.metrics is None else self.metrics.stage(name)
+
+    def pattern(self, delete_matching: str):
+        if delete_matching not in self.patterns:
+            self.patterns[delete_matching] = re.compile(delete_matching)
+        return self.patterns[delete_matching]
+
+    def word_pattern(self, delete_matching: str):
+        """
+        :return: when delete_matching is a negated character class like "[^a-zA-Z]", a regex matching runs of the
+        characters it keeps (which are exactly the words left after deleting), otherwise None. Also None if the
+        class keeps whitespace, as the runs would then span several words.
+        """
+        if delete_matching not in self.word_patterns:
+            match = re.fullmatch(r'\[\^([^\]]+)\]', delete_matching)
+            pattern = None if match is None else re.compile(f'[{match.group(1)}]+')
+            if pattern is not None and pattern.search(' \t\n\r\f\v') is not None:
+                pattern = None
+            self.word_patterns[delete_matching] = pattern
+        return self.word_patterns[delete_matching]
+
+    def count_words(self, results: Union[MonsterListing, MonsterSearch, Iterable], as_percentage: bool = False,
+                    delete_matching: str = "[^a-zA-Z]", match_phrases: bool = False, workers: int = 1,
+                    chunk_size: int = 500) -> DataFrame:
+        """
+        :param results: listing, search, or any iterable of listings to count keywords in
+        :param as_percentage: give frequencies as a percentage of listings rather than a count
+        :param delete_matching: delete any character not matching before splitting into words
+        :param match_phrases: match keywords against the description as it is with a KeywordMatcher, which handles
+        multi-word keywords and symbols without needing delete_matching
+        :param workers: number of processes to spread the listings over
+        :param chunk_size: listings handed to a worker at a time
+        :return: DataFrame of keywords and their frequencies, most frequent first
+        """
 
-    def count_words(self, results: Union[MonsterListing, MonsterSearch], as_percentage: bool = False,
-                    delete_matching: str = "[^a-zA-Z]") -> DataFrame:
+        listings = [results] if type(results) == MonsterListing else results
+        descriptions = (self.description_of(listing) for listing in listings)
+        return self.count_descriptions(descriptions, as_percentage=as_percentage, delete_matching=delete_matching,
+                                       match_phrases=match_phrases, workers=workers, chunk_size=chunk_size)
 
-        freqs = Counter()
-        if type(results) == MonsterListing:
-            freqs.update(self.words_from_description(results, delete_matching=delete_matching))
-        else:
-            [freqs.update(self.words_from_description(listing, delete_matching=delete_matching)) for listing in results]
+    def count_descriptions(self, descriptions: Iterable, as_percentage: bool = False,
+                           delete_matching: str = "[^a-zA-Z]", match_phrases: bool = False, workers: int = 1,
+                           chunk_size: int = 500) -> DataFrame:
+        """
+        Like count_words, but works straight off description strings, e.g. the description column of a DataFrame
+        loaded with MonsterSearch.read_parquet, without building any MonsterListings.
+        :param descriptions: iterable of job descriptions
+        :return: DataFrame of keywords and their frequencies, most frequent first
+        """
+
+        import numpy as np
+
+        # a keyword's frequency is the number of listings mentioning it, i.e. a column sum
+        with self.stage('count'):
+            matrix = self.presence_rows(descriptions, delete_matching=delete_matching, match_phrases=match_phrases,
+                                        workers=workers, chunk_size=chunk_size)
+        freqs = np.asarray(matrix.sum(axis=0)).ravel()
+        return self.frequency_frame(freqs, matrix.shape[0], as_percentage=as_percentage)
+
+    def frequency_frame(self, freqs, num_listings: int, as_percentage: bool = False) -> DataFrame:
+        """
+        :param freqs: number of listings mentioning each keyword, in the order of self.keywords
+        :param num_listings: number of listings counted
+        :param as_percentage: give frequencies as a percentage of listings rather than a count
+        :return: DataFrame of keywords and their frequencies, most frequent first
+        """
+        import pandas as pd
 
-        out_dict = dict([(x, freqs[x.lower()]) for x in self.keywords])
+        out_dict = dict([(x, freqs[i]) for i, x in enumerate(self.keywords)])
 
         df = pd.DataFrame.from_dict(out_dict, orient='index', columns=['Frequency']).reset_index()
         df = df.rename(columns={'index': 'Keyword'})
         if as_percentage:
-            df['Frequency'] = df['Frequency'] * 100 / (1 if type(results) == MonsterListing else len(results))
+            df['Frequency'] = df['Frequency'] * 100 / num_listings
         return df.sort_values(by='Frequency', ascending=False).reset_index(drop=True)
 
-    def words_from_description(self, listing: MonsterListing, delete_matching: str = "[^a-zA-Z]") -> list:
+    def presence_matrix(self, listings: Iterable, delete_matching: str = "[^a-zA-Z]", match_phrases: bool = False,
+                        workers: int = 1, chunk_size: int = 500) -> csr_matrix:
         """
-        Extract words from description in listing. Some code lifted from Jesse Steinweg-Woods' blog post.
-        :param listing: MonsterListing to get words from
+        Tokenize every listing once and record which keywords each one mentions.
+        :param listings: MonsterSearch or any iterable of MonsterListings
         :param delete_matching: delete any character not matching
-        :return:
+        :param match_phrases: find keywords with a KeywordMatcher instead of splitting into words
+        :param workers: number of processes to spread the listings over. Each works on chunk_size listings at a time
+        and the partial matrices are stacked in order, so the result is the same as with one worker.
+        :param chunk_size: listings handed to a worker at a time
+        :return: sparse (listing x keyword) matrix with a 1 wherever the listing mentions the keyword.
+        Columns follow the order of self.keywords.
         """
+        descriptions = (self.description_of(listing) for listing in listings)
+        return self.presence_rows(descriptions, delete_matching=delete_matching, match_phrases=match_phrases,
+                                  workers=workers, chunk_size=chunk_size)
+
+    @staticmethod
+    def description_of(listing: MonsterListing) -> str:
         if listing.description is None:
             listing.fetch_description()
+        return listing.description
 
-        description = listing.description
+    def presence_rows(self, descriptions: Iterable, delete_matching: str = "[^a-zA-Z]", match_phrases: bool = False,
+                      workers: int = 1, chunk_size: int = 500) -> csr_matrix:
+        """
+        :param descriptions: job descriptions, one per row
+        :return: presence matrix (see presence_matrix) of the descriptions
+        """
+        import numpy as np
+        from scipy.sparse import csr_matrix, vstack
+
+        if workers > 1:
+            # only descriptions are sent to the workers: listings hold on to connection pools, which can't be pickled
+            descriptions = iter(descriptions)
+            chunks = iter(lambda: list(islice(descriptions, chunk_size)), [])
+            parts = list()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # executor.map would read and pickle the whole stream up front; with at most two chunks per worker in
+                # flight, a big archive is read as fast as it's counted and memory stays flat
+                in_flight = deque()
+                for chunk in chunks:
+                    if len(in_flight) >= 2 * workers:
+                        parts.append(in_flight.popleft().result())
+                    # the stop words go along too, so the workers never have to import nltk
+                    in_flight.append(executor.submit(presence_rows_in_worker, tuple(self.keywords), chunk,
+                                                     delete_matching, match_phrases, self.stop_words))
+                parts.extend(future.result() for future in in_flight)
+            if len(parts) == 0:
+                return csr_matrix((0, len(self.keywords)), dtype=np.int32)
+            return vstack(parts, format='csr')
+
+        indptr = [0]
+        indices = list()
+        for description in descriptions:
+            indices.extend(self.keyword_columns(description, delete_matching=delete_matching,
+                                                match_phrases=match_phrases))
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.int32)
+        return csr_matrix((data, np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+                          shape=(len(indptr) - 1, len(self.keywords)))
+
+    def keyword_columns(self, description: str, delete_matching: str = "[^a-zA-Z]",
+                        match_phrases: bool = False) -> list:
+        """
+        :param description: job description
+        :return: sorted positions in self.keywords of the keywords the description mentions
+        """
+        with self.stage('keywords'):
+            if match_phrases:
+                if self.matcher is None:
+                    self.matcher = KeywordMatcher(self.keywords)
+                columns = self.phrase_columns
+                words = self.matcher.find(self.clean_description(description))
+            else:
+                columns = self.word_columns
+                words = self.tokenize(description, delete_matching=delete_matching)
+            row = [j for keyword in columns if keyword in words for j in columns[keyword]]
+            row.sort()
+            return row
 
-        lines = (line.strip() for line in description.splitlines())
+    def tokenize(self, description: str, delete_matching: str = "[^a-zA-Z]") -> set:
+        """
+        :return: set of lowercase words in the description. Unlike words_from_description, stop words are not
+        removed, as they can't match a keyword that isn't itself a stop word.
+        """
+        words = self.words_in(description, delete_matching)
+
+        # periods are stripped from words unless they're part of a keyword like "D3.js"
+        stripped = [w.replace('.', '') for w in words if '.' in w and w not in self.keyword_set]
+        return words.union(stripped) if stripped else words
+
+    def words_in(self, description: str, delete_matching: str = "[^a-zA-Z]") -> frozenset:
+        """
+        :return: the lowercase words left in the description once everything matching delete_matching is deleted.
+        Doesn't depend on the keywords, so it's what the token cache holds.
+        """
+        if self.token_cache is not None:
+            key = self.token_cache.key(description, delete_matching)
+            words = self.token_cache.get(key)
+            if words is not None:
+                return words
+
+        word_pattern = self.word_pattern(delete_matching)
+        if word_pattern is not None:
+            # pick out the words directly rather than deleting everything around them and splitting
+            text = self.clean_description(description)
+            words = frozenset(word.lower() for word in word_pattern.findall(text))
+        else:
+            words = frozenset(self.clean_description(description, delete_matching).lower().split())
+
+        if self.token_cache is not None:
+            self.token_cache.put(key, words)
+        return words
 
-        # break multi-headlines into a line each
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    def clean_description(self, description: str, delete_matching: str = None) -> str:
+        """
+        Some code lifted from Jesse Steinweg-Woods' blog post.
+        :param description: job description
+        :param delete_matching: delete any character not matching. Nothing is deleted if None.
+        :return: description with everything matching delete_matching replaced by spaces
+        """
+        with self.stage('clean'):
+            lines = (line.strip() for line in description.splitlines())
 
-        # Get rid of all blank lines and ends of line
-        text = ''.join(chunk + ' ' for chunk in chunks if chunk).encode('utf-8')
+            # break multi-headlines into a line each
+            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
 
-        # Now clean out all of the unicode junk
-        text = text.decode('unicode_escape')
+            # Get rid of all blank lines and ends of line
+            text = ''.join(chunk + ' ' for chunk in chunks if chunk).encode('utf-8')
 
-        # Get rid of any terms that aren't words
-        text = re.sub(delete_matching, " ", text)
+            # Now clean out all of the unicode junk
+            text = text.decode('unicode_escape')
 
-        text = text.lower().split()  # Go to lower case and split them apart
+            # Get rid of any terms that aren't words
+            if delete_matching is not None:
+                text = self.pattern(delete_matching).sub(" ", text)
 
-        stop_words = set(stopwords.words("english"))
+            return text
+
+    def words_from_description(self, listing: MonsterListing, delete_matching: str = "[^a-zA-Z]") -> list:
+        """
+        Extract words from description in listing.
+        :param listing: MonsterListing to get words from
+        :param delete_matching: delete any character not matching
+        :return:
+        """
+        if listing.description is None:
+            listing.fetch_description()
+
+        # Go to lower case and split them apart
+        text = self.words_in(listing.description, delete_matching)
 
         words = list()
-        keywords_lower = [x.lower() for x in self.keywords]
         for w in text:
-            if w not in keywords_lower:
+            if w not in self.keyword_set:
                 w = w.replace('.', '')
-            if w not in stop_words and len(w) > 0:
+            if w not in self.stop_words and len(w) > 0:
                 words.append(w)
 
         # Last, just get the set of these.
         return list(set(words))
 
 
+class KeywordAggregator:
+    """
+    Running keyword statistics over a changing set of listings. Each listing's keywords are worked out once, when
+    it's added, and kept by job id, so adding or removing listings only costs as much as the listings that changed.
+    """
+
+    def __init__(self, keywords: tuple, delete_matching: str = "[^a-zA-Z]", match_phrases: bool = False,
+                 metrics: CrawlMetrics = None, token_cache: TokenCache = None):
+        """
+        :param keywords: keywords to count
+        :param delete_matching: as in MonsterTextParser.count_words
+        :param match_phrases: as in MonsterTextParser.count_words
+        :param metrics: as in MonsterTextParser
+        :param token_cache: as in MonsterTextParser
+        """
+        self.parser = MonsterTextParser(keywords, metrics=metrics, token_cache=token_cache)
+        self.delete_matching = delete_matching
+        self.match_phrases = match_phrases
+        import numpy as np
+
+        self.listing_columns = dict()  # job id -> tuple of the keyword columns the listing mentions
+        self.freqs = np.zeros(len(keywords), dtype=np.int64)
+
+    def add(self, listing: MonsterListing):
+        """
+        Count a listing, replacing any earlier version of it.
+        """
+        columns = self.parser.keyword_columns(self.parser.description_of(listing),
+                                              delete_matching=self.delete_matching, match_phrases=self.match_phrases)
+        self.remove(listing.job_id)
+        self.listing_columns[listing.job_id] = tuple(columns)
+        self.freqs[columns] += 1
+
+    def remove(self, job_id: str):
+        """
+        Stop counting a listing. Does nothing if it isn't being counted.
+        """
+        columns = self.listing_columns.pop(job_id, None)
+        if columns is not None:
+            self.freqs[list(columns)] -= 1
+
+    def update(self, search: MonsterSearch) -> tuple:
+        """
+        Bring the statistics in line with a search's active listings: new ones are added and ones that have
+        expired or disappeared are removed. Listings without a description yet (e.g. the request failed) are left
+        until a later update finds one, rather than counted as mentioning nothing.
+        :return: (number added, number removed)
+        """
+        active = search.active_job_ids()
+        active_set = set(active)
+        gone = [job_id for job_id in self.listing_columns if job_id not in active_set]
+        for job_id in gone:
+            self.remove(job_id)
+        new = [job_id for job_id in active if job_id not in self.listing_columns and
+               len(search.results[job_id].description) > 0]
+        for job_id in new:
+            self.add(search.results[job_id])
+        return len(new), len(gone)
+
+    def count_words(self, as_percentage: bool = False) -> DataFrame:
+        """
+        :return: the same DataFrame MonsterTextParser.count_words gives for the listings being counted
+        """
+        return self.parser.frequency_frame(self.freqs, len(self.listing_columns), as_percentage=as_percentage)
+
+    def __len__(self):
+        return len(self.listing_columns)
+
+    def save(self, path: str):
+        """
+        Snapshot the statistics to a JSON file.
+        """
+        out_dict = {'keywords': list(self.parser.keywords), 'delete_matching': self.delete_matching,
+                    'match_phrases': self.match_phrases,
+                    'listings': dict((job_id, list(columns)) for job_id, columns in self.listing_columns.items())}
+        with open(path, 'w') as f:
+            json.dump(out_dict, f)
+
+    @classmethod
+    def load(cls, path: str) -> KeywordAggregator:
+        """
+        Load a snapshot written by save.
+        """
+        with open(path, 'r') as f:
+            in_dict = json.load(f)
+        aggregator = cls(tuple(in_dict['keywords']), delete_matching=in_dict['delete_matching'],
+                         match_phrases=in_dict['match_phrases'])
+        for job_id, columns in in_dict['listings'].items():
+            aggregator.listing_columns[job_id] = tuple(columns)
+            aggregator.freqs[columns] += 1
+        return aggregator
+
+
+worker_parsers = dict()  # keywords -> MonsterTextParser, so each worker process only builds one per keyword tuple
+
+
+def presence_rows_in_worker(keywords: tuple, descriptions: list, delete_matching: str, match_phrases: bool,
+                            stop_words: frozenset = None) -> csr_matrix:
+    """
+    Run in a worker process by MonsterTextParser.presence_matrix.
+    """
+    if keywords not in worker_parsers:
+        worker_parsers[keywords] = MonsterTextParser(keywords, stop_words=stop_words)
+    return worker_parsers[keywords].presence_rows(descriptions, delete_matching=delete_matching,
+                                                  match_phrases=match_phrases)
+
+
+class RateLimiter:
+    """
+    Token bucket used to pace requests to Monster. Tokens refill at `rate` per second up to `burst`,
+    and acquire() blocks until one is available. Safe to share between threads.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1):
+        """
+        :param rate: tokens added per second (i.e. sustained requests per second). Non-positive disables limiting.
+        :param burst: maximum number of tokens that can accumulate
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.last_refill = monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+
+def print_event(event: dict):
+    print(event['message'])
+
+
+class StageTimer:
+    """
+    Times a `with` block and adds it to a CrawlMetrics stage, counting an error if the block raised.
+    """
+    __slots__ = ('metrics', 'stage', 'num_bytes', 'start')
+
+    def __init__(self, metrics: CrawlMetrics, stage: str, num_bytes: int = 0):
+        self.metrics = metrics
+        self.stage = stage
+        self.num_bytes = num_bytes
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.add(self.stage, perf_counter() - self.start, num_bytes=self.num_bytes,
+                         error=exc_type is not None)
+        return False
+
+
+class CrawlMetrics:
+    """
+    Where a crawl's time goes. For each stage, records how many times it ran, the total seconds spent in it, the bytes
+    it handled and how many times it failed. Progress messages and errors go to a callback rather than straight to
+    stdout. Safe to share between threads.
+
+    Stages recorded by this module:
+    - request: HTTP requests as seen by MonsterFetcher, connecting included (bytes are response bodies)
+    - server_latency: from sending a request to getting the response headers back
+    - rate_limit_wait: blocked waiting for a rate limiter (what used to be the sleep(1) between requests)
+    - backoff: sleeping before a retry
+    - parse_search, parse_description: BeautifulSoup parsing of results pages and listing pages (bytes are HTML)
+    - count: MonsterTextParser counting a batch of descriptions
+    - keywords: finding the keywords in one description (part of count)
+    - clean: clean_description (part of keywords)
+    """
+
+    def __init__(self, on_event=print_event):
+        """
+        :param on_event: called with a dict for every progress message or error, e.g.
+        {'event': 'description', 'message': 'Description #3 successfully fetched.', 'index': 3, 'job_id': ...,
+        'status': 'fetched'}. The default prints the message; None discards everything.
+        """
+        self.on_event = on_event
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = dict()  # stage -> [count, seconds, bytes, errors]
+            self.profile_stats = None
+
+    def stage(self, name: str, num_bytes: int = 0) -> StageTimer:
+        """
+        :return: context manager timing its block as one run of stage `name`
+        """
+        return StageTimer(self, name, num_bytes)
+
+    def add(self, name: str, seconds: float = 0.0, num_bytes: int = 0, error: bool = False, count: int = 1):
+        with self.lock:
+            totals = self.stages.get(name)
+            if totals is None:
+                totals = self.stages[name] = [0, 0.0, 0, 0]
+            totals[0] += count
+            totals[1] += seconds
+            totals[2] += num_bytes
+            totals[3] += error
+
+    def event(self, event: str, message: str, **fields):
+        if self.on_event is not None:
+            self.on_event(dict(event=event, message=message, **fields))
+
+    @contextmanager
+    def profile(self, path: str = None, limit: int = 20):
+        """
+        Run cProfile over a `with` block. Only the calling thread is profiled, so this is most useful with
+        max_workers=1. The slowest functions end up in summary()['profile'].
+        :param path: also save the raw profile here, for pstats or snakeviz
+        :param limit: number of functions kept in the summary, by cumulative time
+        """
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            if path is not None:
+                profiler.dump_stats(path)
+            stats = pstats.Stats(profiler).stats
+            slowest = sorted(stats.items(), key=lambda x: x[1][3], reverse=True)[:limit]
+            with self.lock:
+                self.profile_stats = [{'function': f'{filename}:{line}({function})', 'calls': calls,
+                                       'own_seconds': own_time, 'cumulative_seconds': cumulative_time}
+                                      for (filename, line, function), (_, calls, own_time, cumulative_time, _)
+                                      in slowest]
+
+    def summary(self) -> dict:
+        """
+        :return: totals for every stage recorded so far, plus the profile if one was taken
+        """
+        with self.lock:
+            out = {'stages': dict((name, {'count': count, 'seconds': seconds, 'bytes': num_bytes, 'errors': errors})
+                                  for name, (count, seconds, num_bytes, errors) in self.stages.items())}
+            if self.profile_stats is not None:
+                out['profile'] = list(self.profile_stats)
+        return out
+
+    def json_summary(self, path: str = None) -> str:
+        """
+        :param path: also write the summary to this file
+        :return: summary() as JSON
+        """
+        out_str = json.dumps(self.summary(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(out_str)
+        return out_str
+
+
+class ResponseCache:
+    """
+    Persistent cache of HTTP responses, stored in a SQLite file and keyed by URL.
+
+    Entries younger than `ttl` are served without touching the network. Older entries are revalidated with
+    If-None-Match/If-Modified-Since, so unchanged pages cost a 304 instead of a full download. Once the stored
+    bodies exceed `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_bytes: int = 500 * 1024 ** 2):
+        """
+        :param path: SQLite file to keep responses in (':memory:' for a throwaway cache)
+        :param ttl: seconds a response is considered fresh
+        :param max_bytes: maximum total size of stored bodies
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, status INTEGER, '
+                              'headers TEXT, body BLOB, size INTEGER, fetched_at REAL, accessed_at REAL)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+
+    def get(self, url: str, max_age: float = None) -> Optional[tuple]:
+        """
+        :param url: URL to look up
+        :param max_age: seconds a response is considered fresh, instead of ttl
+        :return: (response, is_fresh) if the URL is cached, None otherwise
+        """
+        with self.lock:
+            row = self.conn.execute('SELECT status, headers, body, fetched_at FROM responses WHERE url = ?',
+                                    (url,)).fetchone()
+            if row is None:
+                return None
+            with self.conn:
+                self.conn.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time(), url))
+
+        status, headers, body, fetched_at = row
+        max_age = self.ttl if max_age is None else max_age
+        return self.build_response(url, status, json.loads(headers), body), time() - fetched_at < max_age
+
+    def put(self, url: str, response: requests.Response):
+        """
+        :param url: requested URL, which may differ from response.url after a redirect
+        :param response: response to store
+        """
+        now = time()
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                              (url, response.status_code, json.dumps(dict(response.headers)),
+                               response.content, len(response.content), now, now))
+            self.evict()
+
+    def touch(self, url: str, headers: dict = None):
+        """
+        Mark a cached response as fresh again, e.g. after the server answered 304 Not Modified.
+        :param url: cached URL
+        :param headers: validators from the 304 response, which replace the stored ones
+        """
+        with self.lock:
+            row = self.conn.execute('SELECT headers FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return
+            stored = json.loads(row[0])
+            for key in ('ETag', 'Last-Modified'):
+                if headers is not None and key in headers:
+                    stored[key] = headers[key]
+            now = time()
+            with self.conn:
+                self.conn.execute('UPDATE responses SET headers = ?, fetched_at = ?, accessed_at = ? WHERE url = ?',
+                                  (json.dumps(stored), now, now, url))
+
+    def evict(self):
+        # caller holds the lock
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute('SELECT url, size FROM responses ORDER BY accessed_at').fetchall():
+            self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def build_response(url: str, status: int, headers: dict, body: bytes) -> requests.Response:
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+        return response
+
+
+class MonsterFetcher:
+    """
+    Shared HTTP layer for talking to Monster. Keeps a pool of keep-alive connections, applies timeouts, and retries
+    connection errors and 429/5xx responses with exponential backoff and jitter (honoring Retry-After).
+    Pass one into MonsterSearch and MonsterListing so a whole crawl reuses the same connections.
+
+    Given a ResponseCache, fresh pages are served from disk and stale ones are revalidated. With offline=True
+    nothing goes over the network at all, which replays a previous crawl from the cache.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))  # upper bounds in seconds
+
+    def __init__(self, timeout: tuple = (5, 30), max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, pool_size: int = 10, retry_statuses: tuple = RETRY_STATUSES,
+                 cache: ResponseCache = None, offline: bool = False, host_rate_limit: float = 0,
+                 host_burst: int = 1, metrics: CrawlMetrics = None):
+        """
+        :param timeout: (connect, read) timeouts in seconds
+        :param max_retries: how many times a failed request is retried before giving up
+        :param backoff_factor: the n-th retry waits around backoff_factor * 2^n seconds
+        :param max_backoff: upper bound on any single wait, including one requested via Retry-After
+        :param pool_size: number of connections kept alive per host; should be at least the number of workers
+        :param retry_statuses: HTTP status codes that are worth retrying
+        :param cache: where responses are stored between runs; nothing is cached if None
+        :param offline: only serve responses from the cache; without one, every request fails
+        :param host_rate_limit: maximum requests per second to any one host, shared by everything using this
+        fetcher (cache hits don't count). 0 means no limit.
+        :param host_burst: requests allowed back to back to one host before host_rate_limit kicks in
+        :param metrics: where this fetcher, and the searches and listings using it, record per-stage timings and
+        send progress messages; by default a CrawlMetrics that prints them
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self.cache = cache
+        self.offline = offline
+        self.host_rate_limit = host_rate_limit
+        self.host_burst = host_burst
+        self.host_limiters = dict()  # host -> RateLimiter
+        self.metrics = metrics if metrics is not None else CrawlMetrics()
+        self.pool_size = pool_size
+        self.session = None  # made on the first request, so loading a saved search doesn't import requests
+
+        self.lock = Lock()
+        self.reset_stats()
+
+    def get_session(self) -> requests.Session:
+        with self.lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self.session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                self.session.mount('http://', adapter)
+                self.session.mount('https://', adapter)
+            return self.session
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = 0
+            self.retries = 0
+            self.failures = 0
+            self.bytes = 0
+            self.cache_hits = 0
+            self.revalidations = 0
+            self.latency_histogram = dict((bound, 0) for bound in self.LATENCY_BUCKETS)
+
+    def stats(self) -> dict:
+        """
+        :return: counters for every request made through this fetcher so far
+        """
+        with self.lock:
+            return {'requests': self.requests, 'retries': self.retries, 'failures': self.failures,
+                    'bytes': self.bytes, 'cache_hits': self.cache_hits, 'revalidations': self.revalidations,
+                    'latency_histogram': dict(self.latency_histogram)}
+
+    def record(self, latency: float, num_bytes: int = 0, error: bool = False):
+        self.metrics.add('request', latency, num_bytes=num_bytes, error=error)
+        with self.lock:
+            self.requests += 1
+            self.bytes += num_bytes
+            for bound in self.LATENCY_BUCKETS:
+                if latency <= bound:
+                    self.latency_histogram[bound] += 1
+                    break
+
+    def backoff(self, attempt: int, response: requests.Response = None) -> float:
+        """
+        :param attempt: number of retries made so far
+        :param response: the response that triggered the retry, if any
+        :return: seconds to wait before the next attempt
+        """
+        if response is not None and 'Retry-After' in response.headers:
+            retry_after = response.headers['Retry-After']
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    wait = 0
+            if wait > 0:
+                return min(wait, self.max_backoff)
+
+        # "full jitter": spread retries out so concurrent workers don't hammer the server in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def get(self, url: str, max_age: float = None, **kwargs) -> requests.Response:
+        """
+        GET a URL, going through the cache if there is one.
+        :param url: URL to fetch
+        :param max_age: seconds a cached response is served without asking the server; the cache's ttl by default.
+        0 always revalidates, for pages that change often. Offline, cached responses are served whatever their age.
+        :param kwargs: passed on to requests.Session.get
+        :return: the response. Raises ConnectionError when offline and the URL isn't cached.
+        """
+        cached = self.cache.get(url, max_age=max_age) if self.cache is not None else None
+        if cached is not None:
+            cached_response, is_fresh = cached
+            if is_fresh or self.offline:
+                with self.lock:
+                    self.cache_hits += 1
+                return cached_response
+
+            # stale: ask the server whether the page changed since we stored it
+            headers = dict(kwargs.pop('headers', None) or {})
+            if 'ETag' in cached_response.headers:
+                headers['If-None-Match'] = cached_response.headers['ETag']
+            if 'Last-Modified' in cached_response.headers:
+                headers['If-Modified-Since'] = cached_response.headers['Last-Modified']
+            kwargs['headers'] = headers
+        elif self.offline:
+            from requests.exceptions import ConnectionError
+
+            raise ConnectionError(f'{url} is not in the cache and the fetcher is offline')
+        elif self.cache is None:
+            return self.request(url, **kwargs)
+
+        response = self.request(url, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(url, response.headers)
+            with self.lock:
+                self.revalidations += 1
+            return cached[0]
+        if response.status_code == 200:
+            self.cache.put(url, response)
+        return response
+
+    def request(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET a URL over the network, retrying transient failures.
+        :param url: URL to fetch
+        :param kwargs: passed on to requests.Session.get
+        :return: the final response. Raises the last exception if every attempt failed to connect.
+        """
+        from requests.exceptions import RequestException
+
+        kwargs.setdefault('timeout', self.timeout)
+        limiter = self.host_limiter(url)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                with self.metrics.stage('rate_limit_wait'):
+                    limiter.acquire()
+            start = monotonic()
+            try:
+                response = self.get_session().get(url, **kwargs)
+            except RequestException:
+                self.record(monotonic() - start, error=True)
+                if attempt >= self.max_retries:
+                    with self.lock:
+                        self.failures += 1
+                    raise
+                response = None
+            else:
+                self.record(monotonic() - start, len(response.content),
+                            error=response.status_code in self.retry_statuses)
+                self.metrics.add('server_latency', response.elapsed.total_seconds())
+                if response.status_code not in self.retry_statuses:
+                    return response
+                if attempt >= self.max_retries:
+                    with self.lock:
+                        self.failures += 1
+                    return response
+
+            wait = self.backoff(attempt, response)
+            with self.metrics.stage('backoff'):
+                sleep(wait)
+            attempt += 1
+            with self.lock:
+                self.retries += 1
+
+    def host_limiter(self, url: str) -> Optional[RateLimiter]:
+        if self.host_rate_limit <= 0:
+            return None
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.host_limiters:
+                self.host_limiters[host] = RateLimiter(rate=self.host_rate_limit, burst=self.host_burst)
+            return self.host_limiters[host]
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+
+default_fetcher = None
+
+
+def get_default_fetcher() -> MonsterFetcher:
+    """
+    :return: the fetcher used by searches and listings that weren't given one
+    """
+    global default_fetcher
+    if default_fetcher is None:
+        default_fetcher = MonsterFetcher()
+    return default_fetcher
+
+
+METRO_AREAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'metro_areas.json')
+
+
 class MonsterLocation:
 
+    shared = dict()  # formatted (city, state) -> shared MonsterLocation without alternates; see MonsterLocation.get
+    metro_areas = dict()  # path -> {"City, ST": [alternates]}, loaded once per file
+
     @staticmethod
     def format_location(city: str, state: str) -> tuple:
         """
         :param city: Search city
         :param state: Search state
-        :return: (city, state) formatted properly
+        :return: (city, state) formatted properly. The strings are interned, so equal keys share memory.
         """
 
         state = state.upper()
         city = ' '.join([x.lower().capitalize() for x in city.split(' ')])  # capitalize all words
-        return city, state
+        return sys.intern(city), sys.intern(state)
+
+    @classmethod
+    def get(cls, city: str, state: str) -> MonsterLocation:
+        """
+        Shared location without alternates, formatted once and reused by every listing in the same place.
+        Don't modify the location you get back.
+        :param city: Search city
+        :param state: Search state
+        """
+        key = cls.format_location(city, state)  # so every spelling of a place shares one location
+        location = cls.shared.get(key)
+        if location is None:
+            location = cls.shared[key] = cls(*key)
+        return location
+
+    @classmethod
+    def get_from_string(cls, loc_string: str) -> MonsterLocation:
+        """
+        :param loc_string: e.g. "Brooklyn, NY"
+        :return: shared location without alternates (see get)
+        """
+        city, state = [x.strip() for x in loc_string.split(',')]
+        return cls.get(city, state)
+
+    @classmethod
+    def from_metro(cls, loc_string: str, path: str = METRO_AREAS_PATH) -> MonsterLocation:
+        """
+        :param loc_string: e.g. "New York, NY"
+        :param path: JSON file mapping "City, ST" to the other places in its metro area
+        :return: location with its metro area as alternates (none if it isn't in the file)
+        """
+        if path not in cls.metro_areas:
+            with open(path, 'r') as f:
+                cls.metro_areas[path] = dict((str(cls.get_from_string(main)), tuple(alternates))
+                                             for main, alternates in json.load(f).items())
+        location = cls.get_from_string(loc_string)
+        return cls(location.city, location.state, alternates=cls.metro_areas[path].get(str(location), ()))
 
     @classmethod
     def from_string(cls, loc_string: str, alternates: tuple = ()) -> MonsterLocation:
@@ -118,13 +1243,17 @@ class MonsterLocation:
         """
 
         self.city, self.state = self.format_location(city, state)
+        self.key = (self.city, self.state)
 
         # We store the alternates
         if len(alternates) > 0:
-            self.alternates = [MonsterLocation.from_string(x) for x in alternates]
+            self.alternates = [MonsterLocation.get_from_string(x) for x in alternates]
         else:
             self.alternates = alternates
 
+        # every (city, state) this location accepts, so checking a listing against it is a single set lookup
+        self.acceptable_keys = frozenset([self.key] + [x.key for x in self.alternates])
+
     @staticmethod
     def search_var_from_arguments(city: str, state: str) -> str:
         return f'{"-".join(city.split(" "))}__2C-{state}'
@@ -133,22 +1262,22 @@ class MonsterLocation:
     def search_var(self) -> str:
         return self.search_var_from_arguments(self.city, self.state)
 
-    # compares two locations. comparisons are also made between each location and the other's alternates.
+    # whether two locations are the same place, or one is among the other's alternates
+    def matches(self, other: MonsterLocation) -> bool:
+        if len(self.alternates) > 0:
+            return other.key in self.acceptable_keys
+        return self.key in other.acceptable_keys
+
+    # equality and hashing both go by the exact (city, state), so sets and dicts of locations behave; use matches()
+    # to take alternates into account
     def __eq__(self, other) -> bool:
         if isinstance(other, MonsterLocation):
-            if self.city == other.city and self.state == other.state:
-                return True
-            else:
-                if len(self.alternates) > 0:
-                    for alt in self.alternates:
-                        if alt.city == other.city and alt.state == other.state:
-                            return True
-                elif len(other.alternates) > 0:
-                    for alt in other.alternates:
-                        if alt.city == self.city and alt.state == self.state:
-                            return True
+            return self.key == other.key
         return False
 
+    def __hash__(self) -> int:
+        return hash(self.key)
+
     def __str__(self) -> str:
         return f'{self.city}, {self.state}'
 
@@ -160,8 +1289,11 @@ class MonsterSearch:
     The search results are stored in a dictionary. The key is the job ID, and the value is a MonsterListing
     """
 
+    SEARCH_URL = 'https://www.monster.com/jobs/search/'
+
     def __init__(self, location: MonsterLocation, query: str, extra_titles: tuple = None, results: dict = None,
-                 job_ids: list = None):
+                 job_ids: list = None, fetcher: MonsterFetcher = None, last_page: int = 0,
+                 parser: str = DEFAULT_PARSER, expired: dict = None):
         """
         Parameters
         ----------
@@ -170,16 +1302,29 @@ class MonsterSearch:
         :param extra_titles: Other valid title substrings
         :param results: dictionary of search results indexed by unique job id
         :param job_ids: list of job ids in order they were fetched
+        :param fetcher: HTTP layer used for the search and its listings; defaults to a shared MonsterFetcher
+        :param last_page: last results page fetched completely by a paginated crawl, so it can be resumed
+        :param parser: BeautifulSoup tree builder used for the search and its listings, e.g. 'lxml'
+        :param expired: job id -> time (ISO 8601, UTC) the listing was found to be gone from the search results
         """
 
         self.location = location
-        self.base_url = f'https://www.monster.com/jobs/search/?q={"-".join(query.lower().split(" "))}' \
+        self.base_url = f'{self.SEARCH_URL}?q={"-".join(query.lower().split(" "))}' \
             f'&where={self.location.search_var()}'
         self.query = query
         self.extra_titles = extra_titles
         self.results = results
         self.job_ids = job_ids  # job ids of results; helps us maintain an order...
         self.job_id_index = 0  # for iteration
+        self.fetcher = fetcher if fetcher is not None else get_default_fetcher()
+        self.last_page = last_page
+        self.parser = parser
+        self.expired = expired if expired is not None else dict()
+        self.seen_job_ids = set() if job_ids is None else set(job_ids)  # every data-jobid seen, valid or not
+
+    @property
+    def metrics(self) -> CrawlMetrics:
+        return self.fetcher.metrics
 
     def is_valid_listing(self, listing: MonsterListing) -> bool:
         """
@@ -187,64 +1332,265 @@ class MonsterSearch:
         :param listing: search result from Monster
         :return: True if the listing matches our query and is in the right location, False otherwise
         """
-        if self.location == listing.location:
-            if self.query.lower() in listing.job_title.lower():
+        if self.location.matches(listing.location):
+            job_title = listing.job_title.lower()
+            if self.query.lower() in job_title:
                 return True
-            for title in self.extra_titles:
-                if title.lower() in listing.job_title.lower():
+            for title in self.extra_titles or ():
+                if title.lower() in job_title:
                     return True
         return False
 
-    def fetch_listings(self, limit: int = 10, refetch: bool = False):
-
-        if self.results is not None and len(self.results) != 0 and not refetch:
-            print("You've already fetched the results for this query. Set refetch to True to fetch them again.")
+    def fetch_listings(self, limit: int = 10, refetch: bool = False, paginate: bool = False, resume: bool = False,
+                       max_workers: int = 1, rate_limit: float = 1.0, on_listings=None) -> bool:
+        """
+        Fetch search results and keep the valid listings.
+        :param limit: number of results pages to fetch
+        :param refetch: throw away existing results and start over
+        :param paginate: request one page at a time instead of all `limit` pages in one response. Stops early
+        once a page turns up no job IDs we haven't already seen.
+        :param resume: with paginate, keep existing results and carry on from the page after last_page
+        :param max_workers: with paginate, how many pages are requested at once
+        :param rate_limit: with paginate, maximum page requests per second
+        :param on_listings: called with the new valid listings from each results page as soon as it's parsed, e.g. to
+        start fetching their descriptions while the search carries on
+        :return: True if every results page asked for came back (or the results ran out first), False if the search
+        wasn't run or a page failed, in which case the results are incomplete
+        """
+        if paginate and resume and self.results is not None:
+            return self.fetch_pages(self.last_page + 1, limit, max_workers=max_workers, rate_limit=rate_limit,
+                                    on_listings=on_listings)
+        elif self.results is not None and len(self.results) != 0 and not refetch:
+            self.metrics.event('warning', "You've already fetched the results for this query. "
+                                          "Set refetch to True to fetch them again.")
+            return False
         else:
             self.results = dict()
             self.job_ids = list()
-            search_url = f'{self.base_url}&stpage=1&page={limit}'  # tack on page ranges to base URL
+            self.seen_job_ids = set()
+            self.last_page = 0
+            if paginate:
+                return self.fetch_pages(1, limit, max_workers=max_workers, rate_limit=rate_limit,
+                                        on_listings=on_listings)
 
             try:
-                response = requests.get(search_url)
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                all_listings = soup.find_all('section', attrs={'data-jobid': True})
-
-                for item in all_listings:
-                    listing = MonsterListing.from_search_results(item)
-                    if listing is not None and self.is_valid_listing(listing) and listing.job_id not in self.results:
-                        self.results[listing.job_id] = listing
-                        self.job_ids.append(listing.job_id)
-            except (gaierror, ConnectionError, MaxRetryError, NewConnectionError) as e:
-                print(e)
-
-    def fetch_descriptions(self, suppress_output=False):
-        desc_count = 0
-        if self.results is not None:
-            for job_id in self.job_ids:
-                listing = self.results[job_id]
-                desc_count += 1
-                if len(listing.description) > 0 and not suppress_output:
-                    print(f'Description #{desc_count} is already present.')
-                else:
-                    listing.fetch_description()
-                    if not suppress_output:
-                        if len(listing.description) > 0:
-                            print(f'Description #{desc_count} successfully fetched.')
-                        else:
-                            print(f'Listing #{desc_count} appears to be dead...')
-                    sleep(1)  # so we don't overwhelm the server (idea courtesy of Jesse Steinweg-Woods)
-        else:
-            print("You need to fetch the listings first: use fetch_listings(...)")
+                html = self.fetch_page(1, limit)
+            except network_errors() as e:
+                self.metrics.event('error', str(e), url=self.page_url(1, limit))
+                return False
+            self.add_listings(html, on_listings=on_listings)
+            self.last_page = limit
+            return True
+
+    def page_url(self, first_page: int, last_page: int) -> str:
+        return f'{self.base_url}&stpage={first_page}&page={last_page}'  # tack on page ranges to base URL
+
+    def fetch_page(self, first_page: int, last_page: int = None) -> str:
+        """
+        :param first_page: first results page to fetch
+        :param last_page: last results page in the same response; first_page by default
+        :return: HTML of the results. Raises requests' HTTPError if the server answered with an error status (e.g. a
+        503 still failing after the fetcher's retries), so it isn't mistaken for a page with no results.
+        """
+        # results change from day to day, so unlike job pages they're never served from the cache unchecked
+        response = self.fetcher.get(self.page_url(first_page, first_page if last_page is None else last_page),
+                                    max_age=0)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_pages(self, first_page: int, last_page: int, max_workers: int = 1, rate_limit: float = 1.0,
+                    on_listings=None) -> bool:
+        """
+        Fetch results pages first_page..last_page one page per request, max_workers at a time.
+        Pages are processed in order; last_page is updated after each one so a failed crawl can be resumed. The
+        first page that fails (a network error or an error status) ends the crawl, and last_page stays before it.
+        :return: False if a page failed, True otherwise
+        """
+        limiter = RateLimiter(rate=rate_limit, burst=max(1, max_workers))
+
+        def fetch(page: int) -> str:
+            with self.metrics.stage('rate_limit_wait'):
+                limiter.acquire()
+            return self.fetch_page(page)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for window_start in range(first_page, last_page + 1, max(1, max_workers)):
+                window = range(window_start, min(window_start + max(1, max_workers), last_page + 1))
+                try:
+                    for page, html in zip(window, executor.map(fetch, window)):
+                        if self.add_listings(html, on_listings=on_listings) == 0:
+                            self.last_page = page
+                            return True  # nothing new: we've gone past the end of the results
+                        self.last_page = page
+                except network_errors() as e:
+                    self.metrics.event('error', str(e), page=self.last_page + 1)
+                    return False
+        return True
+
+    def add_listings(self, html: str, on_listings=None) -> int:
+        """
+        Parse a page of search results and add its valid listings to results.
+        :param html: search results page
+        :param on_listings: called with the listings added (see fetch_listings)
+        :return: number of job IDs on the page that hadn't been seen before
+        """
+        with self.metrics.stage('parse_search', num_bytes=len(html)):
+            soup = make_soup(html, self.parser, parse_only=strainer('SEARCH_RESULTS_STRAINER'))
+            all_listings = soup.find_all('section', attrs={'data-jobid': True})
+
+        new_ids = 0
+        added = list()
+        for item in all_listings:
+            if item['data-jobid'] in self.seen_job_ids:
+                continue
+            self.seen_job_ids.add(item['data-jobid'])
+            new_ids += 1
+            listing = MonsterListing.from_search_results(item, fetcher=self.fetcher, parser=self.parser)
+            if listing is not None and self.is_valid_listing(listing) and listing.job_id not in self.results:
+                self.results[listing.job_id] = listing
+                self.job_ids.append(listing.job_id)
+                added.append(listing)
+        if on_listings is not None:
+            on_listings(added)
+        return new_ids
+
+    def fetch_descriptions(self, suppress_output=False, max_workers: int = 1, rate_limit: float = 1.0,
+                           burst: int = 1, writer: JsonlWriter = None, job_ids: list = None) -> Optional[list]:
+        """
+        Fetch the description of every listing that doesn't have one yet.
+        :param suppress_output: don't report progress to the fetcher's metrics callback (see CrawlMetrics)
+        :param max_workers: maximum number of descriptions fetched at once
+        :param rate_limit: maximum requests per second across all workers (replaces the old fixed sleep(1))
+        :param burst: number of requests allowed back to back before rate_limit kicks in
+        :param writer: if given, each listing is appended to it as soon as its description is settled, so a crawl
+        that dies halfway keeps everything fetched so far. Only listings fetched (or found dead) are written, so
+        resuming into the same file doesn't copy the ones already present again.
+        :param job_ids: only look at these listings rather than all of them
+        :return: list of (job_id, status) in job_ids order, where status is 'present', 'fetched', 'dead' or
+        'failed' (the request itself failed after retries, so the listing may still be alive)
+        """
+        if self.results is None:
+            self.metrics.event('warning', "You need to fetch the listings first: use fetch_listings(...)")
+            return None
+
+        # so we don't overwhelm the server (idea courtesy of Jesse Steinweg-Woods)
+        limiter = RateLimiter(rate=rate_limit, burst=burst)
+        job_ids = self.job_ids if job_ids is None else job_ids
+
+        from requests.exceptions import RequestException
+
+        def fetch(job_id: str) -> str:
+            listing = self.results[job_id]
+            if len(listing.description) > 0:
+                return 'present'
+            with self.metrics.stage('rate_limit_wait'):
+                limiter.acquire()
+            try:
+                listing.fetch_description()
+            except RequestException:
+                return 'failed'
+            return 'fetched' if len(listing.description) > 0 else 'dead'
+
+        statuses = list()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # map yields in job_ids order, so progress is reported in order even when fetches finish out of order
+            for desc_count, status in enumerate(executor.map(fetch, job_ids), 1):
+                statuses.append(status)
+                if writer is not None and status in ('fetched', 'dead'):
+                    writer.write(self.results[job_ids[desc_count - 1]])
+                if not suppress_output:
+                    if status == 'present':
+                        message = f'Description #{desc_count} is already present.'
+                    elif status == 'fetched':
+                        message = f'Description #{desc_count} successfully fetched.'
+                    elif status == 'failed':
+                        message = f'Description #{desc_count} could not be fetched.'
+                    else:
+                        message = f'Listing #{desc_count} appears to be dead...'
+                    self.metrics.event('description', message, index=desc_count,
+                                       job_id=job_ids[desc_count - 1], status=status)
+
+        return list(zip(job_ids, statuses))
+
+    def update_listings(self, limit: int = 10, paginate: bool = False, max_workers: int = 1,
+                        rate_limit: float = 1.0, save_to: str = None, suppress_output: bool = True) -> dict:
+        """
+        Re-run the search and merge it into the results we already have, rather than starting over: only listings
+        that weren't there before have their descriptions fetched, listings that have disappeared are marked as
+        expired (and kept), and expired listings that come back are marked active again. Active listings still
+        without a description (e.g. the request failed last time) are tried again. If a results page fails, nothing
+        is marked as expired: the listings missing may just be on the pages that didn't come back.
+        :param limit: number of results pages to fetch
+        :param paginate: fetch the results one page at a time (see fetch_listings)
+        :param max_workers: maximum number of pages or descriptions fetched at once
+        :param rate_limit: maximum requests per second
+        :param save_to: if given, save the merged search there afterwards (see save)
+        :param suppress_output: don't print progress while fetching descriptions
+        :return: {'new': [...], 'expired': [...], 'returned': [...], 'retried': [...]} lists of job ids,
+        'statuses' from fetch_descriptions for the new and retried listings, and 'complete', whether every results
+        page came back
+        """
+        latest = MonsterSearch(self.location, self.query, extra_titles=self.extra_titles, fetcher=self.fetcher,
+                               parser=self.parser)
+        latest.base_url = self.base_url
+        complete = latest.fetch_listings(limit=limit, paginate=paginate, max_workers=max_workers,
+                                         rate_limit=rate_limit)
+        if latest.results is None or len(latest.results) == 0:
+            # more likely a failed request than every single listing vanishing at once
+            return {'new': [], 'expired': [], 'returned': [], 'retried': [], 'statuses': [], 'complete': complete}
+
+        if self.results is None:
+            self.results = dict()
+            self.job_ids = list()
 
-    def json_dict(self) -> dict:
+        now = datetime.now(timezone.utc).isoformat()
+        new_ids = [job_id for job_id in latest.job_ids if job_id not in self.results]
+        expired_ids = [job_id for job_id in self.job_ids if job_id not in latest.results and
+                       job_id not in self.expired] if complete else []
+        returned_ids = [job_id for job_id in latest.job_ids if job_id in self.expired]
+
+        for job_id in new_ids:
+            self.results[job_id] = latest.results[job_id]
+            self.job_ids.append(job_id)
+            self.seen_job_ids.add(job_id)
+        for job_id in expired_ids:
+            self.expired[job_id] = now
+        for job_id in returned_ids:
+            del self.expired[job_id]
+
+        new_set = set(new_ids)
+        retried_ids = [job_id for job_id in self.active_job_ids()
+                       if job_id not in new_set and len(self.results[job_id].description) == 0]
+
+        statuses = self.fetch_descriptions(suppress_output=suppress_output, max_workers=max_workers,
+                                           rate_limit=rate_limit, job_ids=new_ids + retried_ids)
+        if save_to is not None:
+            self.save(save_to)
+        return {'new': new_ids, 'expired': expired_ids, 'returned': returned_ids, 'retried': retried_ids,
+                'statuses': statuses, 'complete': complete}
+
+    def active_job_ids(self) -> list:
+        """
+        :return: job ids of listings that haven't expired, in order
+        """
+        return [job_id for job_id in self.job_ids if job_id not in self.expired]
+
+    def header_dict(self) -> dict:
+        """
+        :return: everything about the search except its results
+        """
         out_dict = dict()
         out_dict['location'] = {'main': self.location.__str__(),
                                 'alternates': [x.__str__() for x in self.location.alternates]}
         out_dict['query'] = self.query
         out_dict['extra_titles'] = self.extra_titles
         out_dict['base_url'] = self.base_url
+        out_dict['last_page'] = self.last_page
+        out_dict['expired'] = self.expired
+        return out_dict
+
+    def json_dict(self) -> dict:
+        out_dict = self.header_dict()
         out_dict['results'] = dict()
         out_dict['job_ids'] = list()
 
@@ -257,19 +1603,201 @@ class MonsterSearch:
         return json.dumps(self.json_dict())
 
     @classmethod
-    def json_deserialize(cls, in_dict=None, in_str=None) -> MonsterSearch:
+    def json_deserialize(cls, in_dict=None, in_str=None, fetcher: MonsterFetcher = None,
+                         parser: str = DEFAULT_PARSER) -> MonsterSearch:
         if in_str is not None:
             in_dict = json.loads(in_str)
-        loc_dict = in_dict['location']
-        location = MonsterLocation.from_string(loc_dict['main'], alternates=loc_dict['alternates'])
-        query = in_dict['query']
-        extra_titles = in_dict['extra_titles']
         results = in_dict['results']
         job_ids = in_dict['job_ids']
 
-        deser_results = dict([(job_id, MonsterListing.json_deserialize(in_dict=results[job_id])) for job_id in results])
+        deser_results = dict([(job_id, MonsterListing.json_deserialize(in_dict=results[job_id], fetcher=fetcher,
+                                                                        parser=parser))
+                              for job_id in results])
+
+        return cls.from_header(in_dict, deser_results, job_ids, fetcher=fetcher, parser=parser)
+
+    @classmethod
+    def from_header(cls, header: dict, results: dict, job_ids: list, fetcher: MonsterFetcher = None,
+                    parser: str = DEFAULT_PARSER) -> MonsterSearch:
+        """
+        :param header: search details, as written by header_dict
+        :param results: dictionary of search results indexed by unique job id
+        :param job_ids: list of job ids in order they were fetched
+        :return: the search
+        """
+        loc_dict = header['location']
+        location = MonsterLocation.from_string(loc_dict['main'], alternates=loc_dict['alternates'])
+        return cls(location, header['query'], extra_titles=header['extra_titles'], results=results,
+                   job_ids=job_ids, fetcher=fetcher, last_page=header.get('last_page', 0), parser=parser,
+                   expired=header.get('expired'))
+
+    def save(self, path: str):
+        """
+        Save the search in the format matching the file extension: .parquet, .jsonl (optionally .gz/.zst), or JSON.
+        The search is written to a temporary file next to path and then moved over it, so a crash mid-save leaves
+        the previous save as it was.
+        :param path: file to write
+        """
+        directory, name = os.path.split(path)
+        tmp_path = os.path.join(directory, f'.{os.getpid()}.{name}')  # same extension, so the same format
+        try:
+            if path.endswith('.parquet'):
+                self.to_parquet(tmp_path)
+            elif '.jsonl' in name:
+                self.to_jsonl(tmp_path)
+            else:
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.json_dict(), f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str, fetcher: MonsterFetcher = None, parser: str = DEFAULT_PARSER) -> MonsterSearch:
+        """
+        Load a search written by save.
+        :param path: file to read
+        """
+        if path.endswith('.parquet'):
+            return cls.from_parquet(path, fetcher=fetcher, parser=parser)
+        if '.jsonl' in os.path.basename(path):
+            return cls.from_jsonl(path, fetcher=fetcher, parser=parser)
+        with open(path, 'r') as f:
+            return cls.json_deserialize(in_dict=json.load(f), fetcher=fetcher, parser=parser)
+
+    def to_jsonl(self, path: str):
+        """
+        Save the search as JSON Lines: a header record, then one record per listing in job_ids order.
+        :param path: file to write. Compressed if it ends in .gz (or .zst, with the zstandard package installed).
+        """
+        with JsonlWriter(path, self, append=False) as writer:
+            for listing in self:
+                writer.write(listing)
+
+    @classmethod
+    def from_jsonl(cls, path: str, fetcher: MonsterFetcher = None, parser: str = DEFAULT_PARSER,
+                   lazy: bool = False) -> MonsterSearch:
+        """
+        Load a search saved with to_jsonl or a JsonlWriter. If a listing was written more than once, the last
+        record wins but the listing keeps its original place in job_ids.
+        :param path: file to read
+        :param lazy: leave descriptions in the file and read each one when it's first used (see iter_jsonl)
+        """
+        header = cls.read_jsonl_header(path)
+        results = dict()
+        job_ids = list()
+        for listing in cls.iter_jsonl(path, fetcher=fetcher, parser=parser, lazy=lazy):
+            if listing.job_id not in results:
+                job_ids.append(listing.job_id)
+            results[listing.job_id] = listing
+
+        return cls.from_header(header, results, job_ids, fetcher=fetcher, parser=parser)
+
+    @staticmethod
+    def read_jsonl_header(path: str) -> dict:
+        """
+        :param path: file written by to_jsonl or a JsonlWriter
+        :return: the header record, i.e. the search's header_dict()
+        """
+        with open_jsonl(path, 'rb') as f:
+            record = json.loads(f.readline())
+        if record.get('type') != 'search':
+            raise ValueError(f'{path} does not start with a search header')
+        return record['search']
+
+    @staticmethod
+    def iter_jsonl(path: str, fetcher: MonsterFetcher = None, parser: str = DEFAULT_PARSER, lazy: bool = False):
+        """
+        Read listings one at a time, so archives of any size can be analyzed in constant memory.
+        A record that can't be decoded (e.g. cut off when a crawl was killed mid-write) is skipped, and so are blank
+        lines; a compressed stream that was itself cut off ends the listings there.
+        :param path: file written by to_jsonl or a JsonlWriter
+        :param lazy: don't keep descriptions in memory; each listing reads its own back from the file when needed
+        and can drop it again with evict_description()
+        :return: generator of MonsterListings in the order they were written
+        """
+        store = JsonlDescriptionStore(path) if lazy else None
+        with open_jsonl(path, 'rb') as f:
+            while True:
+                offset = f.tell()
+                try:
+                    line = f.readline()
+                except EOFError:  # a compressed stream cut off mid-write: nothing after this point can be read
+                    break
+                if not line:
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:  # a truncated record (or a blank line); the crawl may have carried on after it
+                    continue
+                if isinstance(record, dict) and record.get('type') == 'listing':
+                    listing = MonsterListing.json_deserialize(in_dict=record['listing'], fetcher=fetcher,
+                                                              parser=parser)
+                    if store is not None:
+                        listing.attach_store(store, offset)
+                    yield listing
+
+    PARQUET_COLUMNS = ('job_id', 'job_url', 'company', 'title', 'city', 'state', 'description')
+
+    def to_dataframe(self) -> DataFrame:
+        """
+        :return: one row per listing, in job_ids order, with the columns in PARQUET_COLUMNS
+        """
+        import pandas as pd
+
+        rows = [(x.job_id, x.job_url, x.company, x.job_title, x.location.city, x.location.state, x.description)
+                for x in self]
+        return pd.DataFrame.from_records(rows, columns=list(self.PARQUET_COLUMNS))
+
+    def to_parquet(self, path: str, compression: str = 'zstd'):
+        """
+        Save the listings as a Parquet file, with the search header kept in the file's metadata.
+        Requires pyarrow.
+        :param path: file to write
+        :param compression: Parquet compression codec
+        """
+        import pyarrow as pa  # optional; only needed for Parquet
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(self.to_dataframe(), preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'monster_search'] = json.dumps(self.header_dict()).encode('utf-8')
+        pq.write_table(table.replace_schema_metadata(metadata), path, compression=compression)
+
+    @classmethod
+    def from_parquet(cls, path: str, fetcher: MonsterFetcher = None, parser: str = DEFAULT_PARSER) -> MonsterSearch:
+        """
+        Load a search saved with to_parquet. Requires pyarrow.
+        :param path: file to read
+        """
+        import pyarrow.parquet as pq  # optional; only needed for Parquet
+
+        table = pq.read_table(path)
+        header = json.loads(table.schema.metadata[b'monster_search'])
+
+        results = dict()
+        job_ids = list()
+        for row in table.to_pylist():
+            listing = MonsterListing(row['job_id'], row['job_url'], MonsterLocation.get(row['city'], row['state']),
+                                     row['company'], row['title'], row['description'], fetcher=fetcher,
+                                     parser=parser)
+            results[listing.job_id] = listing
+            job_ids.append(listing.job_id)
 
-        return cls(location, query, extra_titles=extra_titles, results=deser_results, job_ids=job_ids)
+        return cls.from_header(header, results, job_ids, fetcher=fetcher, parser=parser)
+
+    @staticmethod
+    def read_parquet(path: str, columns: list = None) -> DataFrame:
+        """
+        Load listings straight into a DataFrame, skipping MonsterListing objects entirely. Requires pyarrow.
+        :param path: a file written by to_parquet, or a directory of them (e.g. a year of crawls)
+        :param columns: only read these columns, e.g. ['description'] to count keywords
+        :return: DataFrame with the columns in PARQUET_COLUMNS
+        """
+        import pyarrow.parquet as pq  # optional; only needed for Parquet
+
+        return pq.read_table(path, columns=columns).to_pandas()
 
     # for iterating through results
     def __iter__(self):
@@ -299,9 +1827,120 @@ class MonsterSearch:
         return out_str
 
 
+def open_jsonl(path: str, mode: str):
+    """
+    Open a JSON Lines file, compressed according to its extension: .gz for gzip, .zst for zstandard.
+    :param path: file to open
+    :param mode: e.g. 'rt', 'wt' or 'at' for text, 'rb' for bytes
+    """
+    encoding = None if 'b' in mode else 'utf-8'
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, encoding=encoding)
+    if path.endswith('.zst'):
+        import zstandard  # optional; only needed for .zst files
+        return zstandard.open(path, mode, encoding=encoding)
+    return open(path, mode.replace('t', ''), encoding=encoding)
+
+
+class JsonlDescriptionStore:
+    """
+    Loads listing descriptions on demand from a JSON Lines file written by JsonlWriter, given the byte offset of
+    the listing's record. Used by MonsterSearch.from_jsonl(..., lazy=True). Seeking is fast in uncompressed files;
+    compressed ones have to be decompressed up to the offset.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.lock = Lock()
+
+    def load(self, offset: int) -> str:
+        with self.lock:
+            if self.file is None:
+                self.file = open_jsonl(self.path, 'rb')
+            self.file.seek(offset)
+            return json.loads(self.file.readline())['listing']['description']
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+class JsonlWriter:
+    """
+    Appends a search to a JSON Lines file one listing at a time. The first line is a header record describing the
+    search; each following line is a listing. Every record is flushed as it's written.
+    """
+
+    def __init__(self, path: str, search: MonsterSearch, append: bool = True):
+        """
+        :param path: file to write. Compressed if it ends in .gz (or .zst, with the zstandard package installed).
+        :param search: search the listings belong to; its header is written if the file is new
+        :param append: add to an existing file rather than starting over
+        """
+        self.path = path
+        separate = False
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            separate = not self.drop_partial_line(path)
+        is_new = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open_jsonl(path, 'at' if append else 'wt')
+        self.lock = Lock()
+        if is_new:
+            self.write_record({'type': 'search', 'search': search.header_dict()})
+        elif separate:
+            self.file.write('\n')  # in case the last record was cut off; the reader skips the blank line otherwise
+
+    @staticmethod
+    def drop_partial_line(path: str) -> bool:
+        """
+        Truncate an uncompressed file back to the end of its last complete line, so a record cut off by a crash
+        doesn't run into the next one written. Compressed files can't be truncated that way.
+        :return: whether the file was checked (i.e. isn't compressed)
+        """
+        if path.endswith('.gz') or path.endswith('.zst'):
+            return False
+        with open(path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 64 * 1024)
+                f.seek(start)
+                block = f.read(end - start)
+                newline = block.rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return True
+                end = start
+            f.truncate(0)  # not even the header was finished
+        return True
+
+    def write(self, listing: MonsterListing):
+        self.write_record({'type': 'listing', 'listing': listing.json_dict()})
+
+    def write_record(self, record: dict):
+        with self.lock:
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 class MonsterListing:
+    # slots rather than a __dict__ keep big searches small; see memory_benchmark.py
+    __slots__ = ('job_id', 'job_url', 'location', 'company', 'job_title', 'fetcher', 'parser', 'description_text',
+                 'store', 'store_key')
+
     def __init__(self, job_id: str, job_url: str, location: MonsterLocation,
-                 company: str, job_title: str, description: str = ''):
+                 company: str, job_title: str, description: str = '', fetcher: MonsterFetcher = None,
+                 parser: str = DEFAULT_PARSER):
         """
         Set up MonsterListing class
         :param job_id: unique job ID that allows one to find the listing
@@ -310,19 +1949,59 @@ class MonsterListing:
         :param company: Company name
         :param job_title: Job title used on website
         :param description: Long description of job duties, expectations, requirements, etc.
+        :param fetcher: HTTP layer used to fetch the description; defaults to a shared MonsterFetcher
+        :param parser: BeautifulSoup tree builder used on the listing page, e.g. 'lxml'
         """
         self.job_id = job_id
         self.job_url = job_url
         self.location = location
-        self.company = company
-        self.job_title = job_title
+        self.company = sys.intern(company)  # the same few companies and titles come up over and over
+        self.job_title = sys.intern(job_title)
         self.description = description
+        self.fetcher = fetcher if fetcher is not None else get_default_fetcher()
+        self.parser = parser
+
+    @property
+    def description(self) -> str:
+        if self.description_text is None and self.store is not None:
+            self.description_text = self.store.load(self.store_key)
+        return self.description_text
+
+    @description.setter
+    def description(self, description: str):
+        self.description_text = description
+        self.store = None  # whatever was stored is out of date now
+        self.store_key = None
+
+    @property
+    def metrics(self) -> CrawlMetrics:
+        return self.fetcher.metrics
+
+    def attach_store(self, store: JsonlDescriptionStore, key):
+        """
+        Drop the description from memory and load it from store when it's next used.
+        :param store: where the description is kept, e.g. a JsonlDescriptionStore
+        :param key: where to find this listing's description in the store
+        """
+        self.description_text = None
+        self.store = store
+        self.store_key = key
+
+    def evict_description(self):
+        """
+        Free the description if it can be loaded again from the listing's store.
+        """
+        if self.store is not None:
+            self.description_text = None
 
     @classmethod
-    def from_search_results(cls, item: Tag) -> Optional[MonsterListing]:
+    def from_search_results(cls, item: Tag, fetcher: MonsterFetcher = None,
+                            parser: str = DEFAULT_PARSER) -> Optional[MonsterListing]:
         """
         Parses listing properties from source. Useful for when we're looping through search results.
         :param item: Search results from BeautifulSoup
+        :param fetcher: HTTP layer the listing will use to fetch its description
+        :param parser: BeautifulSoup tree builder the listing will use on its own page
         :return: MonsterListing with all fields filled except description, which requires another HTTP request.
         """
         if item is not None:
@@ -333,32 +2012,33 @@ class MonsterListing:
             if ',' in loc_string:
                 city, state = [a.strip() for a in loc_string.split(',')]
                 state = state[:2]  # two-letter state format
-                location = MonsterLocation(city, state)
+                location = MonsterLocation.get(city, state)
             else:
-                location = MonsterLocation(NA, NA)  # NA value; will not match any valid locations
+                location = MonsterLocation.get(NA, NA)  # NA value; will not match any valid locations
 
-            job_title = item.find('h2', attrs={'class': 'title'}).find('a', href=True).string.strip()
+            title_link = item.find('h2', attrs={'class': 'title'}).find('a', href=True)
+            job_title = title_link.string.strip()
+            job_url = title_link['href']
 
             company = item \
                 .find('div', attrs={'class': 'company'}) \
                 .find('span', attrs={'class': 'name'}).text.strip()
 
-            job_url = item.find('h2', attrs={'class': 'title'}).find('a', href=True)['href']
-
             # add MonsterListing to results
-            return cls(job_id, job_url, location, company, job_title)
+            return cls(job_id, job_url, location, company, job_title, fetcher=fetcher, parser=parser)
 
     @classmethod
-    def from_id(cls, job_id) -> Optional[MonsterListing]:
+    def from_id(cls, job_id, fetcher: MonsterFetcher = None, parser: str = DEFAULT_PARSER) -> Optional[MonsterListing]:
         temp_url = f'https://www.monster.com/jobs/search/?jobid={job_id}'
+        fetcher = fetcher if fetcher is not None else get_default_fetcher()
 
         # get HTML
-        response = requests.get(temp_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        response = fetcher.get(temp_url)
+        soup = make_soup(response.text, parser, parse_only=strainer('SEARCH_RESULTS_STRAINER'))
 
         # get first item
         item = soup.find('section', attrs={'data-jobid': True})
-        return cls.from_search_results(item)
+        return cls.from_search_results(item, fetcher=fetcher, parser=parser)
 
     def __str__(self) -> str:
         out_str = \
@@ -382,28 +2062,32 @@ class MonsterListing:
         return json.dumps(self.json_dict())
 
     @classmethod
-    def json_deserialize(cls, in_dict=None, in_str=None) -> MonsterListing:
+    def json_deserialize(cls, in_dict=None, in_str=None, fetcher: MonsterFetcher = None,
+                         parser: str = DEFAULT_PARSER) -> MonsterListing:
         if in_str is not None:
             in_dict = json.loads(in_str)
 
         # convert to MonsterListing
         job_id = in_dict['job_id']
         job_url = in_dict['job_url']
-        location = MonsterLocation.from_string(in_dict['location'])
+        location = MonsterLocation.get_from_string(in_dict['location'])
         description = in_dict['description']
         company = in_dict['company']
         job_title = in_dict['job_title']
-        return cls(job_id, job_url, location, company, job_title, description)
+        return cls(job_id, job_url, location, company, job_title, description, fetcher=fetcher, parser=parser)
 
     def fetch_description(self):
-        response = requests.get(self.job_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        job_body = soup.find('div', attrs={'id': 'JobDescription'})
-
-        if job_body is not None:
-            self.description = job_body.get_text(separator=' ')  # add whitespace between HTML tags
-        else:
-            self.description = ''
+        response = self.fetcher.get(self.job_url)
+        if response.status_code in self.fetcher.retry_statuses:
+            response.raise_for_status()  # the server is struggling; that doesn't mean the listing is dead
+        with self.metrics.stage('parse_description', num_bytes=len(response.content)):
+            soup = make_soup(response.text, self.parser, parse_only=strainer('JOB_DESCRIPTION_STRAINER'))
+            job_body = soup.find('div', attrs={'id': 'JobDescription'})
+
+            if job_body is not None:
+                self.description = job_body.get_text(separator=' ')  # add whitespace between HTML tags
+            else:
+                self.description = ''
 
     def get_excerpt(self, word_limit=1000, end_string='...'):
         if self.description is None:
@@ -0,0 +1,57 @@
+from monster import MonsterSearch, MonsterLocation, MonsterFetcher, CrawlMetrics
+from local_monster import LocalMonster
+import json
+
+# Crawls a local stand-in for Monster's search pages one page at a time
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    saved = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+listings = [saved.results[job_id] for job_id in saved.job_ids]
+per_page = 25
+num_pages = (len(listings) + per_page - 1) // per_page
+
+monster = LocalMonster(listings, per_page=per_page)
+MonsterSearch.SEARCH_URL = monster.search_url
+
+search = MonsterSearch(saved.location, saved.query, extra_titles=saved.extra_titles,
+                       fetcher=MonsterFetcher(pool_size=4))
+
+# stop after three pages, then resume where we left off
+search.fetch_listings(limit=3, paginate=True, rate_limit=0)
+assert search.last_page == 3 and search.job_ids == saved.job_ids[:3 * per_page]
+
+search.fetch_listings(limit=num_pages + 5, paginate=True, resume=True, max_workers=4, rate_limit=0)
+assert search.job_ids == saved.job_ids  # everything, in order, with no duplicates
+assert search.last_page == num_pages + 1  # the first page with nothing new ends the crawl early
+assert max(monster.page_requests()) < num_pages + 5
+
+# last_page survives serialization
+assert MonsterSearch.json_deserialize(in_str=search.json_serialize()).last_page == search.last_page
+
+# a location that matches nothing keeps paging until the results run out, but keeps no listings
+elsewhere = MonsterSearch(MonsterLocation('Boston', 'MA'), saved.query, extra_titles=saved.extra_titles)
+elsewhere.fetch_listings(limit=num_pages + 5, paginate=True, rate_limit=0)
+assert len(elsewhere) == 0 and elsewhere.last_page == num_pages + 1
+
+# a results request that still fails after the fetcher's retries is an error, not an empty search
+events = list()
+failing = MonsterSearch(saved.location, saved.query, extra_titles=saved.extra_titles,
+                        fetcher=MonsterFetcher(max_retries=1, backoff_factor=0.01,
+                                               metrics=CrawlMetrics(on_event=events.append)))
+monster.failures[3] = [503, 503]
+failing.fetch_listings(limit=3)
+assert len(failing) == 0 and failing.last_page == 0
+assert [x['event'] for x in events] == ['error'] and '503' in events[0]['message']
+
+# so does a page that fails mid-crawl: last_page stays before it, and resuming picks it up
+events.clear()
+monster.failures[2] = [503, 503]
+assert not failing.fetch_listings(limit=num_pages + 5, paginate=True, rate_limit=0)
+assert failing.last_page == 1 and failing.job_ids == saved.job_ids[:per_page]
+assert [(x['event'], x['page']) for x in events] == [('error', 2)]
+assert failing.fetch_listings(limit=num_pages + 5, paginate=True, resume=True, rate_limit=0)
+assert failing.job_ids == saved.job_ids and failing.last_page == num_pages + 1
+
+monster.shutdown()
@@ -0,0 +1,39 @@
+from monster import MonsterSearch, MonsterTextParser
+from helpers import DATA_SCI_KEYWORDS
+from time import perf_counter
+import json
+
+# Checks that counting keywords across several processes gives the same answer as counting in one
+
+if __name__ == '__main__':  # worker processes import this file too
+    filename = './data/data_scientist_nyc_search.json'
+    with open(filename, 'r') as f:
+        search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+    delete_matching = "[^a-zA-Z.+3]"  # the "." and "3" are for D3.js
+    parser = MonsterTextParser(DATA_SCI_KEYWORDS)
+
+    serial = parser.count_words(search, as_percentage=True, delete_matching=delete_matching)
+    parallel = parser.count_words(search, as_percentage=True, delete_matching=delete_matching, workers=4,
+                                  chunk_size=16)
+    assert serial.equals(parallel)
+
+    # a stream of listings works as well as a MonsterSearch, and so does phrase matching
+    stream = (listing for listing in search)
+    assert parser.count_words(stream, workers=3, chunk_size=50, match_phrases=True).equals(
+        parser.count_words(search, match_phrases=True))
+
+    # rows stay in listing order, however many more chunks there are than chunks in flight
+    assert (parser.presence_matrix(search, workers=4, chunk_size=7) != parser.presence_matrix(search)).nnz == 0
+    assert (parser.presence_matrix(iter(search), workers=2, chunk_size=1) != parser.presence_matrix(search)).nnz == 0
+
+    # a bigger corpus, to see the workers pay off
+    corpus = list(search) * 50
+    start = perf_counter()
+    serial = parser.count_words(corpus, delete_matching=delete_matching)
+    serial_time = perf_counter() - start
+    start = perf_counter()
+    parallel = parser.count_words(corpus, delete_matching=delete_matching, workers=4)
+    parallel_time = perf_counter() - start
+    assert serial.equals(parallel)
+    print(f'{len(corpus)} listings: {serial_time:.2f}s in one process, {parallel_time:.2f}s in four')
@@ -0,0 +1,31 @@
+from monster import MonsterSearch, MonsterTextParser
+from helpers import DATA_SCI_KEYWORDS
+from tempfile import TemporaryDirectory
+import json
+import os
+
+# Checks saving searches to Parquet and counting keywords straight from the description column (needs pyarrow)
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+delete_matching = "[^a-zA-Z.+3]"  # the "." and "3" are for D3.js
+parser = MonsterTextParser(DATA_SCI_KEYWORDS)
+
+with TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'search.parquet')
+    search.to_parquet(path)
+    assert MonsterSearch.from_parquet(path).json_dict() == search.json_dict()
+
+    # a directory of crawls loads as one DataFrame
+    crawls_dir = os.path.join(tmp_dir, 'crawls')
+    os.mkdir(crawls_dir)
+    for day in range(3):
+        search.to_parquet(os.path.join(crawls_dir, f'day-{day}.parquet'))
+    descriptions = MonsterSearch.read_parquet(crawls_dir, columns=['description'])['description']
+    assert len(descriptions) == 3 * len(search)
+
+    expected = parser.count_words(search, as_percentage=True, delete_matching=delete_matching)
+    actual = parser.count_descriptions(descriptions, as_percentage=True, delete_matching=delete_matching)
+    assert expected.equals(actual)
@@ -0,0 +1,48 @@
+from monster import MonsterListing, make_soup, SEARCH_RESULTS_STRAINER, JOB_DESCRIPTION_STRAINER
+from bs4 import FeatureNotFound
+from timeit import Timer
+
+"""
+Measures how many pages per second each HTML parsing backend gets through, using the saved pages in data/fixtures.
+"full" builds a tree of the whole page like the original code did; "strained" only builds the parts we read.
+"""
+
+with open('./data/fixtures/search_results.html', 'r') as f:
+    search_page = f.read()
+with open('./data/fixtures/job_description.html', 'r') as f:
+    job_page = f.read()
+
+
+def parse_search_page(parser: str, strained: bool) -> list:
+    soup = make_soup(search_page, parser, parse_only=SEARCH_RESULTS_STRAINER if strained else None)
+    return [MonsterListing.from_search_results(item, parser=parser)
+            for item in soup.find_all('section', attrs={'data-jobid': True})]
+
+
+def parse_job_page(parser: str, strained: bool) -> str:
+    soup = make_soup(job_page, parser, parse_only=JOB_DESCRIPTION_STRAINER if strained else None)
+    return soup.find('div', attrs={'id': 'JobDescription'}).get_text(separator=' ')
+
+
+def pages_per_second(func, parser: str, strained: bool, repeat: int = 5) -> float:
+    timer = Timer(lambda: func(parser, strained))
+    number, _ = timer.autorange()
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+expected_listings = [x.json_dict() for x in parse_search_page('html.parser', strained=False)]
+expected_description = parse_job_page('html.parser', strained=False)
+
+print(f'{"backend":<24}{"search pages/sec":>18}{"job pages/sec":>16}')
+for parser in ('html.parser', 'lxml'):
+    for strained in (False, True):
+        try:
+            # every backend has to give the same answers as the original one
+            assert [x.json_dict() for x in parse_search_page(parser, strained)] == expected_listings
+            assert parse_job_page(parser, strained).split() == expected_description.split()
+        except FeatureNotFound:
+            print(f'{parser:<24}not installed')
+            break
+        search_rate = pages_per_second(parse_search_page, parser, strained)
+        job_rate = pages_per_second(parse_job_page, parser, strained)
+        print(f'{parser + (" (strained)" if strained else " (full)"):<24}{search_rate:>18.1f}{job_rate:>16.1f}')
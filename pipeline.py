@@ -0,0 +1,298 @@
+from __future__ import annotations
+from monster import MonsterSearch, MonsterLocation, MonsterListing, MonsterFetcher, KeywordAggregator, \
+    ResponseCache, TokenCache, CrawlMetrics, JsonlWriter
+from trends import KeywordTrendStore
+from helpers import DATA_SCI_KEYWORDS
+from queue import Queue, Empty, Full
+from threading import Thread, Event
+import argparse
+import json
+import sys
+import os
+
+"""
+Search -> fetch -> count as a streaming pipeline: listings go off to have their descriptions fetched as soon as their
+results page is parsed, and each description is counted as soon as it arrives, so network and CPU work overlap.
+
+Usage: python pipeline.py "Data Scientist" "New York, NY" --extra-titles "Data Science" --pages 10 --workers 8 \
+    --rate-limit 2 --cache-dir ./data/cache --keywords keywords.txt --format csv --output counts.csv
+
+Run python pipeline.py --help for every option. The exit status is 1 if a results page couldn't be fetched, in which
+case the counts are incomplete.
+"""
+
+
+class PipelineStopped(Exception):
+    """
+    Raised in the search stage to give up on the search once another stage has failed.
+    """
+
+
+class StreamingPipeline:
+
+    def __init__(self, search: MonsterSearch, aggregator: KeywordAggregator, pages: int = 10, paginate: bool = True,
+                 max_workers: int = 8, writer: JsonlWriter = None, on_listing=None, queue_size: int = 100):
+        """
+        :param search: search to run (any results it has already are replaced); its fetcher's host rate limit paces
+        every request
+        :param aggregator: counts the keywords in each listing as it arrives
+        :param pages: number of results pages to fetch
+        :param paginate: fetch results one page at a time, so the first listings are on their way before the last
+        page arrives. Without it every page comes back in one response.
+        :param max_workers: number of descriptions fetched at once
+        :param writer: if given, each listing is appended to it once its description is settled
+        :param on_listing: called from the counting thread with (listing, keywords found) for each listing counted
+        :param queue_size: listings allowed to pile up between stages before the stage feeding them waits
+        """
+        self.search = search
+        self.aggregator = aggregator
+        self.pages = pages
+        self.paginate = paginate
+        self.max_workers = max(1, max_workers)
+        self.writer = writer
+        self.on_listing = on_listing
+        self.listings = Queue(maxsize=queue_size)  # search -> fetch
+        self.fetched = Queue(maxsize=queue_size)  # fetch -> count
+        self.errors = list()  # unexpected exceptions raised in the stage threads
+        self.stopping = Event()  # set when a stage fails, so the others wind down rather than wait on it forever
+        self.statuses = dict()  # job id -> 'present', 'fetched', 'dead' or 'failed'
+        self.complete = False  # whether every results page came back; see MonsterSearch.fetch_listings
+
+    @property
+    def metrics(self) -> CrawlMetrics:
+        return self.search.fetcher.metrics
+
+    def run(self) -> KeywordAggregator:
+        """
+        Run the search, fetch the descriptions and count the keywords, all at once.
+        :return: the aggregator, holding the counts for every listing whose description could be fetched
+        """
+        threads = [Thread(target=self.search_stage, daemon=True)]
+        threads += [Thread(target=self.fetch_stage, daemon=True) for _ in range(self.max_workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            self.count_stage()
+        except Exception:
+            self.stopping.set()
+            raise
+        for thread in threads:
+            thread.join()
+
+        if len(self.errors) > 0:
+            raise self.errors[0]
+        return self.aggregator
+
+    def search_stage(self):
+        try:
+            # each page's listings go off to be fetched as soon as it's parsed; the fetcher does the rate limiting
+            self.complete = self.search.fetch_listings(limit=self.pages, refetch=True, paginate=self.paginate,
+                                                       rate_limit=0, on_listings=self.send_listings)
+        except PipelineStopped:
+            pass  # the stage that failed has recorded its error
+        except Exception as e:
+            self.errors.append(e)
+            self.stopping.set()
+        finally:
+            for _ in range(self.max_workers):
+                self.put(self.listings, None)  # one sign-off per fetch worker
+
+    def send_listings(self, listings: list):
+        for listing in listings:
+            if not self.put(self.listings, listing):
+                raise PipelineStopped()
+
+    def put(self, queue: Queue, item) -> bool:
+        """
+        Put an item on a queue, waiting for room unless the pipeline is stopping.
+        :return: whether the item was put
+        """
+        while not self.stopping.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def get(self, queue: Queue):
+        """
+        Take an item off a queue, waiting for one unless the pipeline is stopping.
+        :return: the item, or None if the pipeline is stopping
+        """
+        while not self.stopping.is_set():
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                pass
+        return None
+
+    def fetch_stage(self):
+        from requests.exceptions import RequestException
+
+        try:
+            while True:
+                listing = self.get(self.listings)
+                if listing is None:
+                    return  # the search is over, or the pipeline is stopping
+                if len(listing.description) > 0:
+                    status = 'present'
+                else:
+                    try:
+                        listing.fetch_description()
+                        status = 'fetched' if len(listing.description) > 0 else 'dead'
+                    except RequestException:
+                        status = 'failed'
+                self.fetched.put((listing, status))
+        except Exception as e:
+            self.errors.append(e)
+            self.stopping.set()
+        finally:
+            self.fetched.put(None)
+
+    def count_stage(self):
+        workers_left = self.max_workers
+        while workers_left > 0:
+            item = self.fetched.get()
+            if item is None:
+                workers_left -= 1
+                continue
+            listing, status = item
+            self.statuses[listing.job_id] = status
+            self.metrics.event('description', f'{listing.job_title} ({listing.company}): {status}',
+                               job_id=listing.job_id, status=status, counted=len(self.aggregator))
+            if status == 'failed':
+                continue  # may still be alive, so it's neither counted nor saved
+            if self.writer is not None:
+                self.writer.write(listing)
+            if status == 'dead':
+                continue  # saved, but like KeywordAggregator.update, only listings with a description are counted
+            self.aggregator.add(listing)
+            if self.on_listing is not None:
+                self.on_listing(listing, self.keywords_of(listing))
+
+    def keywords_of(self, listing: MonsterListing) -> list:
+        keywords = self.aggregator.parser.keywords
+        return [keywords[j] for j in self.aggregator.listing_columns[listing.job_id]]
+
+
+def read_keywords(path: str) -> tuple:
+    """
+    :param path: text file with one keyword per line; blank lines and lines starting with # are skipped
+    """
+    with open(path, 'r') as f:
+        lines = (line.strip() for line in f)
+        return tuple(line for line in lines if line and not line.startswith('#'))
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    arg_parser = argparse.ArgumentParser(description='Search Monster, fetch the listings and count keywords in them, '
+                                                     'all as one streaming pipeline.')
+    arg_parser.add_argument('query', help='job title to search for, e.g. "Data Scientist"')
+    arg_parser.add_argument('location', help='"City, ST"; its metro area (data/metro_areas.json) is included')
+    arg_parser.add_argument('--extra-titles', nargs='*', default=(), help='other job titles that count as a match')
+    arg_parser.add_argument('--pages', type=int, default=10, help='number of results pages to fetch')
+    arg_parser.add_argument('--no-paginate', dest='paginate', action='store_false',
+                            help='fetch every results page in one request')
+    arg_parser.add_argument('--workers', type=int, default=8, help='descriptions fetched at once')
+    arg_parser.add_argument('--rate-limit', type=float, default=1.0,
+                            help='maximum requests per second to Monster (0 for no limit)')
+    arg_parser.add_argument('--burst', type=int, default=1, help='requests allowed back to back')
+    arg_parser.add_argument('--cache-dir', help='keep fetched pages and tokenized descriptions here between runs')
+    arg_parser.add_argument('--offline', action='store_true', help='only use pages already in --cache-dir')
+    arg_parser.add_argument('--keywords', help='file with one keyword per line (default: helpers.DATA_SCI_KEYWORDS)')
+    arg_parser.add_argument('--delete-matching', default='[^a-zA-Z.+3]',
+                            help='regex of characters deleted before splitting descriptions into words')
+    arg_parser.add_argument('--match-phrases', action='store_true',
+                            help='match multi-word and symbol keywords with KeywordMatcher')
+    arg_parser.add_argument('--percentage', action='store_true', help='report the percentage of listings')
+    arg_parser.add_argument('--format', choices=('table', 'csv', 'json', 'jsonl'), default='table',
+                            help='jsonl streams one line per listing as it is counted, then the totals')
+    arg_parser.add_argument('--output', help='write the counts here instead of stdout')
+    arg_parser.add_argument('--save', help='save the search as JSON Lines, one listing at a time')
+    arg_parser.add_argument('--metrics', help='write per-stage timings to this file as JSON')
+    arg_parser.add_argument('--trends', help="append today's counts to this KeywordTrendStore (SQLite file)")
+    arg_parser.add_argument('--quiet', action='store_true', help="don't report progress on stderr")
+    args = arg_parser.parse_args(argv)
+    if args.offline and args.cache_dir is None:
+        arg_parser.error('--offline needs --cache-dir')
+    return args
+
+
+def print_event_to_stderr(event: dict):
+    print(event['message'], file=sys.stderr)
+
+
+def main(argv: list = None) -> StreamingPipeline:
+    args = parse_args(argv)
+
+    response_cache = token_cache = None
+    if args.cache_dir is not None:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        response_cache = ResponseCache(os.path.join(args.cache_dir, 'responses.sqlite'))
+        token_cache = TokenCache(path=os.path.join(args.cache_dir, 'tokens.sqlite'))
+
+    metrics = CrawlMetrics(on_event=None if args.quiet else print_event_to_stderr)
+    fetcher = MonsterFetcher(pool_size=max(args.workers, 1), cache=response_cache, offline=args.offline,
+                             host_rate_limit=args.rate_limit, host_burst=args.burst, metrics=metrics)
+    search = MonsterSearch(MonsterLocation.from_metro(args.location), args.query,
+                           extra_titles=tuple(args.extra_titles), fetcher=fetcher)
+
+    keywords = read_keywords(args.keywords) if args.keywords is not None else tuple(DATA_SCI_KEYWORDS)
+    aggregator = KeywordAggregator(keywords, delete_matching=args.delete_matching, match_phrases=args.match_phrases,
+                                   metrics=metrics, token_cache=token_cache)
+
+    out = open(args.output, 'w') if args.output is not None else sys.stdout
+    writer = JsonlWriter(args.save, search, append=False) if args.save is not None else None
+
+    def stream_listing(listing: MonsterListing, found: list):
+        out.write(json.dumps({'type': 'listing', 'job_id': listing.job_id, 'job_title': listing.job_title,
+                              'company': listing.company, 'keywords': found}) + '\n')
+        out.flush()
+
+    pipeline = StreamingPipeline(search, aggregator, pages=args.pages, paginate=args.paginate,
+                                 max_workers=args.workers, writer=writer,
+                                 on_listing=stream_listing if args.format == 'jsonl' else None)
+    try:
+        pipeline.run()
+    finally:
+        if writer is not None:
+            writer.close()
+        if token_cache is not None:
+            token_cache.close()
+        if response_cache is not None:
+            response_cache.close()
+
+    counts = aggregator.count_words(as_percentage=args.percentage)
+    if args.format == 'table':
+        out.write(counts.to_string(index=False) + '\n')
+    elif args.format == 'csv':
+        counts.to_csv(out, index=False)
+    else:
+        totals = dict(zip(counts['Keyword'], counts['Frequency'].tolist()))
+        record = {'query': args.query, 'location': str(search.location), 'listings': len(aggregator),
+                  'complete': pipeline.complete, 'counts': totals}
+        if args.format == 'jsonl':
+            record['type'] = 'totals'
+        out.write(json.dumps(record) + '\n')
+    if out is not sys.stdout:
+        out.close()
+
+    if not pipeline.complete:
+        metrics.event('error', 'Some results pages could not be fetched, so the counts are incomplete.')
+    elif args.trends is not None:  # an incomplete day would look like a drop in every keyword
+        store = KeywordTrendStore(args.trends)
+        store.record_aggregator(aggregator, args.query, search.location)
+        store.close()
+
+    if args.metrics is not None:
+        summary = metrics.summary()
+        summary['fetcher'] = fetcher.stats()
+        with open(args.metrics, 'w') as f:
+            json.dump(summary, f, indent=2)
+    fetcher.close()
+    return pipeline
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main().complete else 1)
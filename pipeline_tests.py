@@ -0,0 +1,136 @@
+from monster import MonsterSearch, MonsterTextParser, KeywordAggregator, MonsterListing, MonsterFetcher, CrawlMetrics
+from pipeline import main, StreamingPipeline
+from trends import KeywordTrendStore
+from local_monster import LocalMonster
+from tempfile import TemporaryDirectory
+from threading import Thread
+import json
+import os
+
+# Runs the command-line pipeline against a local stand-in for Monster, online and then offline from its cache
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    saved = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+listings = [saved.results[job_id] for job_id in saved.job_ids]
+per_page = 25
+num_pages = (len(listings) + per_page - 1) // per_page
+monster = LocalMonster(listings, per_page=per_page, search_delay=0.2)  # slow search pages, to overlap with
+MonsterSearch.SEARCH_URL = monster.search_url
+for listing in listings[::10]:
+    del monster.descriptions[listing.job_id]  # taken down since the search was run
+
+with TemporaryDirectory() as tmp_dir:
+    keyword_file = os.path.join(tmp_dir, 'keywords.txt')
+    with open(keyword_file, 'w') as f:
+        f.write('# languages\nPython\nR\nSQL\n\nJava\nScala\n')
+    keywords = ('Python', 'R', 'SQL', 'Java', 'Scala')
+
+    base_args = ['Data Scientist', 'New York, NY', '--extra-titles', 'Data Science', '--pages', str(num_pages + 2),
+                 '--workers', '4', '--rate-limit', '0', '--keywords', keyword_file, '--quiet']
+    args = base_args + ['--cache-dir', tmp_dir]
+    output = os.path.join(tmp_dir, 'counts.jsonl')
+    save = os.path.join(tmp_dir, 'search.jsonl')
+
+    pipeline = main(args + ['--format', 'jsonl', '--output', output, '--save', save])
+    aggregator = pipeline.aggregator
+    assert pipeline.complete
+
+    with open(output, 'r') as f:
+        records = [json.loads(line) for line in f]
+    streamed, totals = records[:-1], records[-1]
+    assert totals['type'] == 'totals' and totals['complete']
+    assert totals['listings'] == len(streamed) == len(aggregator) > 0
+
+    # descriptions were being fetched while the search was still going
+    first_description = min(t for x, t in monster.requests if isinstance(x, str))
+    last_page = max(t for x, t in monster.requests if x == num_pages)
+    assert first_description < last_page
+    assert all(x['type'] == 'listing' for x in streamed)
+
+    # the counts match counting the saved search all in one go; dead listings are saved but not counted
+    search = MonsterSearch.load(save)
+    described = [job_id for job_id in search.job_ids if len(search.results[job_id].description) > 0]
+    assert 0 < len(described) < len(search)
+    assert sorted(described) == sorted(x['job_id'] for x in streamed)
+    expected = MonsterTextParser(keywords).count_words([search.results[job_id] for job_id in described],
+                                                       delete_matching='[^a-zA-Z.+3]')
+    assert totals['counts'] == dict(zip(expected['Keyword'], expected['Frequency'].tolist()))
+
+    # and KeywordAggregator.update on the saved search counts the same listings
+    updated = KeywordAggregator(keywords, delete_matching='[^a-zA-Z.+3]')
+    updated.update(search)
+    assert len(updated) == len(aggregator) and updated.freqs.tolist() == aggregator.freqs.tolist()
+    for record in streamed:
+        description = search.results[record['job_id']].description
+        expected_row = MonsterTextParser(keywords).keyword_columns(description, delete_matching='[^a-zA-Z.+3]')
+        assert record['keywords'] == [keywords[j] for j in expected_row]
+
+    # a results page that keeps failing ends the search there, and the run is marked incomplete
+    monster.failures[3] = [503] * 4
+    failed_output = os.path.join(tmp_dir, 'failed.json')
+    failed_trends = os.path.join(tmp_dir, 'failed.sqlite')
+    failed = main(base_args + ['--format', 'json', '--output', failed_output, '--trends', failed_trends])
+    assert not failed.complete and failed.search.last_page == 2
+    assert 0 < len(failed.search) and set(failed.search.job_ids) <= set(saved.job_ids[:2 * per_page])
+    with open(failed_output, 'r') as f:
+        assert not json.load(f)['complete']
+    assert not os.path.exists(failed_trends)  # a partial day isn't recorded as a trend
+
+    # the next day, with the same cache: the first page's listings are gone, and the results pages are fetched again
+    # rather than served from the cache, while the descriptions already seen are not
+    monster.listings = listings[per_page:]
+    monster.requests.clear()
+    next_day_output = os.path.join(tmp_dir, 'next_day.json')
+    next_day = main(args + ['--format', 'json', '--output', next_day_output])
+    assert next_day.complete and len(monster.page_requests()) > 0 and monster.job_requests() == []
+    taken_down = set(saved.job_ids[:per_page])
+    assert sorted(next_day.search.job_ids) == sorted(x for x in search.job_ids if x not in taken_down)
+    with open(next_day_output, 'r') as f:
+        next_day_totals = json.load(f)
+    assert next_day_totals['listings'] < totals['listings']
+
+    # a fetch worker that dies of an unexpected error stops the pipeline, rather than leaving the search waiting for
+    # room in a queue nobody is emptying
+    def broken_fetch(listing: MonsterListing):
+        raise ValueError('broken')
+
+    quiet = MonsterFetcher(metrics=CrawlMetrics(on_event=None))
+    broken = StreamingPipeline(MonsterSearch(saved.location, saved.query, extra_titles=saved.extra_titles,
+                                             fetcher=quiet),
+                               KeywordAggregator(keywords), pages=num_pages + 2, max_workers=1, queue_size=10)
+    raised = list()
+
+    def run_broken():
+        try:
+            broken.run()
+        except ValueError as e:
+            raised.append(e)
+
+    fetch_description = MonsterListing.fetch_description
+    MonsterListing.fetch_description = broken_fetch
+    try:
+        thread = Thread(target=run_broken, daemon=True)
+        thread.start()
+        thread.join(timeout=15)
+    finally:
+        MonsterListing.fetch_description = fetch_description
+    assert not thread.is_alive() and len(raised) == 1
+
+    # the same again offline, straight from the cache
+    monster.shutdown()
+    offline_output = os.path.join(tmp_dir, 'counts.json')
+    trends_path = os.path.join(tmp_dir, 'trends.sqlite')
+    main(args + ['--offline', '--format', 'json', '--output', offline_output, '--trends', trends_path])
+    with open(offline_output, 'r') as f:
+        offline_totals = json.load(f)
+    assert offline_totals['counts'] == next_day_totals['counts']
+    assert offline_totals['listings'] == next_day_totals['listings']
+
+    # and the run's counts went into the trend store
+    store = KeywordTrendStore(trends_path)
+    recorded = store.keyword_counts('Data Scientist', offline_totals['location'])
+    assert dict(zip(recorded['Keyword'], recorded['Frequency'])) == next_day_totals['counts']
+    assert int(recorded['Listings'].iloc[0]) == next_day_totals['listings']
+    store.close()
@@ -0,0 +1,88 @@
+from monster import MonsterSearch, MonsterListing, MonsterFetcher, CrawlMetrics
+from local_monster import LocalMonster
+from tempfile import TemporaryDirectory
+import json
+import os
+
+# Re-crawls a local stand-in for Monster on two "days" and checks only new listings are fetched
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    saved = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+
+def listings(start: int, end: int) -> list:
+    return [saved.results[job_id] for job_id in saved.job_ids[start:end]]
+
+
+monster = LocalMonster(listings(0, 30))
+monster.descriptions = dict((job_id, saved.results[job_id].description) for job_id in saved.job_ids)
+MonsterSearch.SEARCH_URL = monster.search_url
+
+search = MonsterSearch(saved.location, saved.query, extra_titles=saved.extra_titles, fetcher=MonsterFetcher())
+
+with TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'search.jsonl')
+
+    # day one: everything is new
+    changes = search.update_listings(rate_limit=0, save_to=path)
+    assert changes['new'] == saved.job_ids[:30] and len(monster.job_requests()) == 30
+
+    # day two: ten listings are taken down and twenty are posted
+    monster.listings = listings(10, 50)
+    monster.requests.clear()
+    changes = search.update_listings(rate_limit=0, save_to=path)
+    assert changes['new'] == saved.job_ids[30:50]
+    # only the new ones were fetched, and the ones that came back without a description last time
+    no_description = [x for x in saved.job_ids[10:30] if len(saved.results[x].description) == 0]
+    assert changes['retried'] == no_description
+    assert sorted(monster.job_requests()) == sorted(saved.job_ids[30:50] + no_description)
+    assert changes['expired'] == saved.job_ids[:10]
+    assert search.active_job_ids() == saved.job_ids[10:50]
+    assert len(search) == 50  # expired listings are kept
+
+    # day three: one of the expired listings is back
+    monster.listings = listings(9, 50)
+    changes = search.update_listings(rate_limit=0)
+    assert changes['returned'] == [saved.job_ids[9]] and changes['new'] == []
+
+    # the merged search, expiry times included, was saved on day two
+    reloaded = MonsterSearch.load(path)
+    assert reloaded.job_ids == saved.job_ids[:50]
+    assert sorted(reloaded.expired) == sorted(saved.job_ids[:10])
+    assert all(reloaded.results[x].description == saved.results[x].description for x in reloaded.job_ids)
+
+    # a save that dies halfway through leaves the last one as it was
+    with open(path, 'rb') as f:
+        last_save = f.read()
+    broken = search.results[saved.job_ids[20]]
+    json_dict = MonsterListing.json_dict
+    MonsterListing.json_dict = lambda listing: 1 / 0 if listing is broken else json_dict(listing)
+    try:
+        search.save(path)
+    except ZeroDivisionError:
+        pass
+    finally:
+        MonsterListing.json_dict = json_dict
+    with open(path, 'rb') as f:
+        assert f.read() == last_save
+    assert os.listdir(tmp_dir) == ['search.jsonl']  # and nothing left behind
+
+# a re-crawl whose second results page fails expires nothing: the missing listings may just be on the lost pages
+ids = [job_id for job_id in saved.job_ids if len(saved.results[job_id].description) > 0][:100]
+monster.listings = [saved.results[job_id] for job_id in ids]  # four pages
+search = MonsterSearch(saved.location, saved.query, extra_titles=saved.extra_titles,
+                       fetcher=MonsterFetcher(max_retries=1, backoff_factor=0.01, metrics=CrawlMetrics(on_event=None)))
+monster.failures[ids[5]] = [503, 503]  # and one description can't be fetched on the first day
+changes = search.update_listings(paginate=True, rate_limit=0)
+assert changes['complete'] and changes['new'] == ids and dict(changes['statuses'])[ids[5]] == 'failed'
+
+monster.failures[2] = [503, 503]
+changes = search.update_listings(paginate=True, rate_limit=0)
+assert not changes['complete'] and changes['expired'] == [] and search.active_job_ids() == ids
+
+# the description that failed is tried again, and only that one
+assert changes['new'] == [] and changes['retried'] == [ids[5]] and changes['statuses'] == [(ids[5], 'fetched')]
+assert search.results[ids[5]].description == saved.results[ids[5]].description
+
+monster.shutdown()
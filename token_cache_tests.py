@@ -0,0 +1,69 @@
+from monster import MonsterSearch, MonsterTextParser, TokenCache, CrawlMetrics
+from helpers import DATA_SCI_KEYWORDS, PROG_LANG_KEYWORDS
+from tempfile import TemporaryDirectory
+import json
+import os
+
+# Checks that counting through a TokenCache gives the same answers as counting without one, and skips the cleaning
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+unique = len(set(x.description for x in search))  # a few listings were reposted with the same description
+plain = MonsterTextParser(DATA_SCI_KEYWORDS)
+cache = TokenCache()
+metrics = CrawlMetrics()
+cached = MonsterTextParser(DATA_SCI_KEYWORDS, metrics=metrics, token_cache=cache)
+
+for delete_matching in ("[^a-zA-Z]", "[^a-zA-Z.+3]", "[^a-zA-Z ]", "[,;:()]"):
+    expected = plain.count_words(search, delete_matching=delete_matching)
+    assert cached.count_words(search, delete_matching=delete_matching).equals(expected)  # cold
+    assert cached.count_words(search, delete_matching=delete_matching).equals(expected)  # warm
+
+# every distinct description was cleaned once per delete_matching, however many times it was counted
+assert metrics.summary()['stages']['clean']['count'] == 4 * unique
+assert cache.stats() == {'hits': 8 * len(search) - 4 * unique, 'misses': 4 * unique, 'entries': 4 * unique}
+
+# the words don't depend on the keywords, so other parsers can share the cache
+other = MonsterTextParser(PROG_LANG_KEYWORDS, token_cache=cache)
+assert other.count_words(search).equals(MonsterTextParser(PROG_LANG_KEYWORDS).count_words(search))
+assert cache.stats()['misses'] == 4 * unique
+for listing in list(search)[:20]:
+    assert sorted(other.words_from_description(listing)) == sorted(plain.words_from_description(listing))
+
+# least recently used descriptions are dropped first
+small = TokenCache(max_entries=5)
+parser = MonsterTextParser(DATA_SCI_KEYWORDS, token_cache=small)
+descriptions = [x.description for x in search][:6]
+for description in descriptions:
+    parser.tokenize(description)
+assert len(small) == 5
+assert small.get(small.key(descriptions[0], "[^a-zA-Z]")) is None
+assert small.get(small.key(descriptions[5], "[^a-zA-Z]")) is not None
+
+# entries written to disk are there for the next run
+with TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'tokens.sqlite')
+    first_run = TokenCache(path=path)
+    MonsterTextParser(DATA_SCI_KEYWORDS, token_cache=first_run).count_words(search)
+    first_run.close()
+
+    second_run = TokenCache(max_entries=10, path=path)
+    counts = MonsterTextParser(DATA_SCI_KEYWORDS, token_cache=second_run).count_words(search)
+    assert counts.equals(plain.count_words(search))
+    assert second_run.stats() == {'hits': len(search), 'misses': 0, 'entries': 10}
+    second_run.close()
+
+    # the file is bounded too: reading the first twenty again keeps them when it's cut down to fifty
+    bounded = TokenCache(max_entries=10, path=path, max_stored=50)
+    parser = MonsterTextParser(DATA_SCI_KEYWORDS, token_cache=bounded)
+    descriptions = [x.description for x in search][:20]
+    for description in descriptions:
+        parser.tokenize(description)
+    assert bounded.stored() == 50
+    bounded.close()
+
+    third_run = TokenCache(path=path)
+    assert all(third_run.get(third_run.key(x, "[^a-zA-Z]")) is not None for x in descriptions)
+    third_run.close()
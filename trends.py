@@ -0,0 +1,187 @@
+from __future__ import annotations
+from typing import Union, TYPE_CHECKING
+from datetime import date, datetime, timezone
+from threading import Lock
+import sqlite3
+
+if TYPE_CHECKING:
+    from monster import MonsterLocation, KeywordAggregator
+    from pandas import DataFrame
+
+"""
+Keyword counts from every crawl, kept in one SQLite file so trends over time and comparisons between cities can be
+read back in milliseconds, without the raw descriptions.
+"""
+
+
+class KeywordTrendStore:
+    """
+    One row per (crawl, keyword): how many listings mentioned the keyword, alongside how many listings the crawl
+    found, so percentages can be worked out when reading. A crawl is identified by its day, query and location;
+    recording the same one twice (e.g. a cron job run again) replaces the earlier counts.
+
+    Counts are stored clustered by keyword, so a keyword's whole history is one index range however many crawls
+    there have been.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: SQLite file to keep the counts in (':memory:' for a throwaway store)
+        """
+        self.path = path
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS crawls (id INTEGER PRIMARY KEY, day TEXT, query TEXT, '
+                              'location TEXT, listings INTEGER, recorded_at TEXT, UNIQUE (query, location, day))')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS crawls_day ON crawls (day)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS keywords (id INTEGER PRIMARY KEY, keyword TEXT UNIQUE)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS counts (keyword_id INTEGER, crawl_id INTEGER, '
+                              'listings INTEGER, PRIMARY KEY (keyword_id, crawl_id)) WITHOUT ROWID')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS counts_crawl ON counts (crawl_id)')  # one crawl's counts
+
+    @staticmethod
+    def day_string(day: Union[date, str, None]) -> str:
+        if day is None:
+            return datetime.now(timezone.utc).date().isoformat()
+        return day if isinstance(day, str) else day.isoformat()
+
+    def keyword_id(self, keyword: str, create: bool = False):
+        # caller holds the lock
+        row = self.conn.execute('SELECT id FROM keywords WHERE keyword = ?', (keyword,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        return self.conn.execute('INSERT INTO keywords (keyword) VALUES (?)', (keyword,)).lastrowid
+
+    def record(self, query: str, location: Union[MonsterLocation, str], counts: Union[DataFrame, dict],
+               listings: int, day: Union[date, str] = None) -> int:
+        """
+        Append one crawl's keyword counts.
+        :param query: the search's query, e.g. "Data Scientist"
+        :param location: where the search was run
+        :param counts: keyword -> number of listings mentioning it, or the DataFrame count_words returns (as counts,
+        not percentages)
+        :param listings: number of listings counted
+        :param day: day of the crawl, as a date or "YYYY-MM-DD"; today (UTC) by default
+        :return: id of the crawl
+        """
+        if not isinstance(counts, dict):
+            counts = dict(zip(counts['Keyword'], counts['Frequency']))
+        day = self.day_string(day)
+        with self.lock, self.conn:
+            crawl = (query, str(location), day)
+            row = self.conn.execute('SELECT id FROM crawls WHERE query = ? AND location = ? AND day = ?',
+                                    crawl).fetchone()
+            if row is not None:
+                self.conn.execute('DELETE FROM counts WHERE crawl_id = ?', row)
+                self.conn.execute('DELETE FROM crawls WHERE id = ?', row)
+            crawl_id = self.conn.execute('INSERT INTO crawls (day, query, location, listings, recorded_at) '
+                                         'VALUES (?, ?, ?, ?, ?)',
+                                         (day, str(query), str(location), int(listings),
+                                          datetime.now(timezone.utc).isoformat())).lastrowid
+            self.conn.executemany('INSERT INTO counts VALUES (?, ?, ?)',
+                                  ((self.keyword_id(keyword, create=True), crawl_id, int(count))
+                                   for keyword, count in counts.items()))
+        return crawl_id
+
+    def record_aggregator(self, aggregator: KeywordAggregator, query: str, location: Union[MonsterLocation, str],
+                          day: Union[date, str] = None) -> int:
+        """
+        Append the counts held by a KeywordAggregator (e.g. after KeywordAggregator.update on a daily re-crawl).
+        """
+        counts = dict(zip(aggregator.parser.keywords, aggregator.freqs.tolist()))
+        return self.record(query, location, counts, len(aggregator), day=day)
+
+    def frame(self, sql: str, params: list, as_percentage: bool) -> DataFrame:
+        import pandas as pd
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        df = pd.DataFrame.from_records(rows, columns=['Day', 'Query', 'Location', 'Keyword', 'Frequency',
+                                                      'Listings'])
+        if as_percentage:
+            df['Frequency'] = df['Frequency'] * 100 / df['Listings']
+        return df
+
+    def trend(self, keyword: str, query: str = None, location: Union[MonsterLocation, str] = None,
+              start: Union[date, str] = None, end: Union[date, str] = None, as_percentage: bool = False) -> DataFrame:
+        """
+        :param keyword: keyword to follow
+        :param query: only crawls for this query
+        :param location: only crawls in this location
+        :param start: first day to include
+        :param end: last day to include
+        :param as_percentage: give frequencies as a percentage of each crawl's listings rather than a count
+        :return: DataFrame with one row per crawl, oldest first
+        """
+        with self.lock:
+            keyword_id = self.keyword_id(keyword)
+        sql = 'SELECT c.day, c.query, c.location, ?, n.listings, c.listings FROM counts n ' \
+              'JOIN crawls c ON c.id = n.crawl_id WHERE n.keyword_id = ?'
+        params = [keyword, keyword_id]
+        for clause, value in (('c.query = ?', query), ('c.location = ?', location),
+                              ('c.day >= ?', start), ('c.day <= ?', end)):
+            if value is not None:
+                sql += f' AND {clause}'
+                params.append(self.day_string(value) if clause.startswith('c.day') else str(value))
+        return self.frame(sql + ' ORDER BY c.day, c.query, c.location', params, as_percentage)
+
+    def compare(self, keyword: str, query: str = None, day: Union[date, str] = None,
+                as_percentage: bool = False) -> DataFrame:
+        """
+        How a keyword stands in every location: the latest crawl of each (query, location) on or before day.
+        :param keyword: keyword to compare
+        :param query: only crawls for this query
+        :param day: compare as of this day; the most recent crawls by default
+        :param as_percentage: give frequencies as a percentage of each crawl's listings rather than a count
+        :return: DataFrame with one row per (query, location), most frequent first
+        """
+        with self.lock:
+            keyword_id = self.keyword_id(keyword)
+        # the latest day of each (query, location) comes straight off the (query, location, day) index
+        latest = 'SELECT query, location, MAX(day) AS day FROM crawls'
+        conditions = list()
+        params = list()
+        if query is not None:
+            conditions.append('query = ?')
+            params.append(query)
+        if day is not None:
+            conditions.append('day <= ?')
+            params.append(self.day_string(day))
+        if len(conditions) > 0:
+            latest += ' WHERE ' + ' AND '.join(conditions)
+        sql = f'SELECT c.day, c.query, c.location, ?, n.listings, c.listings ' \
+              f'FROM ({latest} GROUP BY query, location) l ' \
+              f'JOIN crawls c ON c.query = l.query AND c.location = l.location AND c.day = l.day ' \
+              f'JOIN counts n ON n.keyword_id = ? AND n.crawl_id = c.id'
+        df = self.frame(sql, [keyword] + params + [keyword_id], as_percentage)
+        return df.sort_values(by='Frequency', ascending=False).reset_index(drop=True)
+
+    def keyword_counts(self, query: str, location: Union[MonsterLocation, str], day: Union[date, str] = None,
+                       as_percentage: bool = False) -> DataFrame:
+        """
+        :return: every keyword's frequency in one crawl (the latest by default), most frequent first, like
+        MonsterTextParser.count_words gave at the time
+        """
+        latest = 'SELECT MAX(day) FROM crawls WHERE query = ? AND location = ?'
+        params = [query, str(location)]
+        if day is not None:
+            latest += ' AND day <= ?'
+            params.append(self.day_string(day))
+        sql = f'SELECT c.day, c.query, c.location, k.keyword, n.listings, c.listings FROM crawls c ' \
+              f'JOIN counts n ON n.crawl_id = c.id JOIN keywords k ON k.id = n.keyword_id ' \
+              f'WHERE c.query = ? AND c.location = ? AND c.day = ({latest})'
+        df = self.frame(sql, [query, str(location)] + params, as_percentage)
+        return df.sort_values(by='Frequency', ascending=False).reset_index(drop=True)
+
+    def __len__(self):
+        """
+        :return: number of crawls recorded
+        """
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM crawls').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
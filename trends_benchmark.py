@@ -0,0 +1,53 @@
+from trends import KeywordTrendStore
+from helpers import DATA_SCI_KEYWORDS
+from tempfile import TemporaryDirectory
+from datetime import date, timedelta
+from time import perf_counter
+import random
+import os
+
+"""
+Query times for a KeywordTrendStore holding three years of daily crawls in 20 cities (random counts), to check that
+trend lookups stay in the millisecond range as the history grows.
+"""
+
+num_days = 3 * 365
+cities = [f'City {i}, ST' for i in range(20)]
+query = 'Data Scientist'
+runs = 20
+
+
+def best_ms(func) -> float:
+    times = list()
+    for _ in range(runs):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times) * 1000
+
+
+with TemporaryDirectory() as tmp_dir:
+    store = KeywordTrendStore(os.path.join(tmp_dir, 'trends.sqlite'))
+    first_day = date(2019, 1, 1)
+
+    start = perf_counter()
+    for i in range(num_days):
+        for city in cities:
+            listings = random.randint(100, 300)
+            counts = dict((keyword, random.randint(0, listings)) for keyword in DATA_SCI_KEYWORDS)
+            store.record(query, city, counts, listings, day=first_day + timedelta(days=i))
+    record_time = perf_counter() - start
+
+    num_crawls = len(store)
+    print(f'{num_crawls:,} crawls, {num_crawls * len(DATA_SCI_KEYWORDS):,} counts, '
+          f'{os.path.getsize(store.path) / 1024 ** 2:.1f} MB, recorded in {record_time:.1f} s')
+    print(f'{"query":<44}{"rows":>8}{"ms":>10}')
+    queries = [('trend: one keyword, one city', lambda: store.trend('Python', location=cities[0])),
+               ('trend: one keyword, one city, last 90 days',
+                lambda: store.trend('Python', location=cities[0], start=first_day + timedelta(days=num_days - 90))),
+               ('trend: one keyword, every city', lambda: store.trend('Python')),
+               ('compare: latest in every city', lambda: store.compare('Python', query=query)),
+               ('keyword_counts: latest in one city', lambda: store.keyword_counts(query, cities[0]))]
+    for name, run in queries:
+        print(f'{name:<44}{len(run()):>8}{best_ms(run):>10.2f}')
+    store.close()
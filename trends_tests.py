@@ -0,0 +1,74 @@
+from monster import MonsterSearch, MonsterTextParser, KeywordAggregator
+from trends import KeywordTrendStore
+from helpers import DATA_SCI_KEYWORDS
+from tempfile import TemporaryDirectory
+from datetime import date
+import json
+import os
+
+# Records a few days of crawls in two cities and reads back trends, comparisons and single crawls
+
+filename = './data/data_scientist_nyc_search.json'
+with open(filename, 'r') as f:
+    search = MonsterSearch.json_deserialize(in_dict=json.load(f))
+
+parser = MonsterTextParser(DATA_SCI_KEYWORDS)
+listings = list(search)
+
+with TemporaryDirectory() as tmp_dir:
+    path = os.path.join(tmp_dir, 'trends.sqlite')
+    store = KeywordTrendStore(path)
+
+    # NYC grows by 20 listings a day; "Boston" is the first 50 listings every day
+    daily = dict()
+    for i, day in enumerate(('2019-06-01', '2019-06-02', '2019-06-03')):
+        counts = parser.count_words(listings[:100 + 20 * i])
+        daily[day] = counts
+        store.record(search.query, search.location, counts, 100 + 20 * i, day=day)
+        store.record(search.query, 'Boston, MA', parser.count_words(listings[:50]), 50, day=day)
+    assert len(store) == 6
+
+    # running a day again replaces it rather than adding another crawl
+    store.record(search.query, search.location, daily['2019-06-03'], 140, day=date(2019, 6, 3))
+    assert len(store) == 6
+
+    def count_of(counts, keyword: str) -> int:
+        return int(counts.loc[counts['Keyword'] == keyword, 'Frequency'].iloc[0])
+
+    trend = store.trend('Python', location=search.location)
+    assert trend['Day'].tolist() == ['2019-06-01', '2019-06-02', '2019-06-03']
+    assert trend['Frequency'].tolist() == [count_of(daily[x], 'Python') for x in trend['Day']]
+    assert trend['Listings'].tolist() == [100, 120, 140]
+
+    percentages = store.trend('Python', location=search.location, start='2019-06-02', as_percentage=True)
+    assert len(percentages) == 2
+    assert abs(percentages['Frequency'].iloc[-1] - 100 * count_of(daily['2019-06-03'], 'Python') / 140) < 1e-9
+
+    assert len(store.trend('Python')) == 6  # every city
+    assert len(store.trend('Fortran')) == 0  # never counted
+
+    # the latest crawl in each city, or the one as of a given day
+    comparison = store.compare('SQL', query=search.query)
+    assert sorted(comparison['Location']) == ['Boston, MA', str(search.location)]
+    assert set(comparison['Day']) == {'2019-06-03'}
+    assert comparison['Frequency'].is_monotonic_decreasing
+    assert set(store.compare('SQL', day='2019-06-01')['Day']) == {'2019-06-01'}
+
+    # one crawl's counts, as count_words gave them
+    latest = store.keyword_counts(search.query, search.location)
+    assert dict(zip(latest['Keyword'], latest['Frequency'])) == \
+        dict(zip(daily['2019-06-03']['Keyword'], daily['2019-06-03']['Frequency']))
+    assert set(store.keyword_counts(search.query, search.location, day='2019-06-02')['Day']) == {'2019-06-02'}
+
+    # a KeywordAggregator can be recorded directly
+    aggregator = KeywordAggregator(DATA_SCI_KEYWORDS)
+    for listing in listings[:30]:
+        aggregator.add(listing)
+    store.record_aggregator(aggregator, search.query, 'Chicago, IL', day='2019-06-03')
+    chicago = store.keyword_counts(search.query, 'Chicago, IL')
+    assert dict(zip(chicago['Keyword'], chicago['Frequency'])) == \
+        dict(zip(aggregator.count_words()['Keyword'], aggregator.count_words()['Frequency']))
+    store.close()
+
+    # everything is still there when the file is opened again
+    assert len(KeywordTrendStore(path).trend('Python')) == 7